@@ -1,84 +1,146 @@
 import streamlit as st
-import pygame
 import time
-from datetime import datetime
+
+# Início da execução do script, usado para medir o custo de cada rerun
+SCRIPT_STARTED = time.perf_counter()
+
 import os
+import uuid
+
+import audio
+import branding
+import instrumentation
+import metrics
+import refresh_policy
+import render
+import resume
+import rooms
+import workout_history
+from perf_stats import RerunSavings, TickStats
+from cue_scheduler import default_cue_scheduler
+from scheduler import default_scheduler
+from workout_plan import simple_plan, interval_plan
+
+# Modos de exibição do timer em andamento
+RENDER_MODES = {
+    "fragmento": "Fragmento (só o painel ao vivo)",
+    "servidor": "Servidor (página inteira)",
+    "cliente": "Navegador (contagem local)",
+}
+
+# Tipos de plano de treino
+PLAN_TYPES = {
+    "simples": "Sessões iguais",
+    "intervalado": "Intervalado",
+}
+
+# Intervalo entre atualizações nos segundos finais de cada sessão (segundos)
+DEFAULT_TICK_INTERVAL = float(os.environ.get("TIMER_TICK_INTERVAL", "0.1"))
+
+# Exibir sempre o painel de depuração (também disponível com ?debug=1)
+DEBUG_PANEL = os.environ.get("TIMER_DEBUG") == "1"
+
+# Configurações que reconstroem o plano de cada tipo ao retomar um treino
+PLAN_SETTINGS = {
+    "simples": ("total_sessions", "session_duration"),
+    "intervalado": ("work_duration", "rest_duration", "rounds", "warmup_duration", "cooldown_duration"),
+}
+
+# Perfil por amostragem de todos os reruns (também disponível por sessão com ?profile=1)
+PROFILE = os.environ.get("TIMER_PROFILE") == "1"
 
 class TrainingTimer:
-    def __init__(self):
-        # Inicializar pygame mixer para audio
-        try:
-            pygame.mixer.init()
-            
-            # Caminho para salvar o arquivo de som baixado
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            sound_dir = os.path.join(base_dir, "Assets")
-            
-            # Criar diretório Assets se não existir
-            if not os.path.exists(sound_dir):
-                os.makedirs(sound_dir)
-                
-            # Caminho para o arquivo de som baixado
-            downloaded_sound_path = os.path.join(sound_dir, "beep_sound.mp3")
-            
-            # URL do som
-            sound_url = "https://cdn.pixabay.com/audio/2024/09/19/audio_3ba45d4346.mp3"
-            
-            # Sempre baixar o arquivo de som
-            try:
-                import requests
-                # Baixar o arquivo de som
-                response = requests.get(sound_url)
-                if response.status_code == 200:
-                    with open(downloaded_sound_path, 'wb') as f:
-                        f.write(response.content)
-                    st.success("Som baixado com sucesso!")
-                else:
-                    st.warning(f"Não foi possível baixar o som: {response.status_code}")
-            except Exception as e:
-                st.warning(f"Erro ao baixar o som: {e}")
-            
-            # Tentar carregar o som baixado
-            try:
-                self.beep_sound = pygame.mixer.Sound(downloaded_sound_path)
-            except Exception as e:
-                st.warning(f"Erro ao carregar o som MP3: {e}")
-                self.beep_sound = None
-        except Exception as e:
-            self.beep_sound = None
-            st.warning(f"Não foi possível inicializar o sistema de áudio: {e}")
+    def __init__(self, clock=time.monotonic, scheduler=None, cues=None, state=None, background=True):
+        self.clock = clock
+        # Estado da sessão injetável (benchmarks usam um dicionário comum e relógio virtual)
+        self.state = state if state is not None else st.session_state
+        # Sem threads de fundo, as fronteiras são detectadas pelo próprio polling do snapshot
+        if background:
+            self.scheduler = scheduler if scheduler is not None else default_scheduler()
+            self.cues = cues if cues is not None else default_cue_scheduler()
+            self.history = workout_history.default_history()
+            self.resume_store = resume.default_store()
+        else:
+            self.scheduler = self.cues = self.history = self.resume_store = None
+        # Mixer e sons decodificados uma vez por processo, em segundo plano depois da primeira página
+        self.audio = audio.get_engine()
+        self.html_bytes = 0
+        self.profiler = None
+        if self.audio.cue_error("beep"):
+            st.warning(f"Não foi possível carregar o som: {self.audio.cue_error('beep')}")
 
     def initialize_session_state(self):
         # Configurações iniciais
-        if 'total_sessions' not in st.session_state:
-            st.session_state.total_sessions = 4
-        if 'session_duration' not in st.session_state:
-            st.session_state.session_duration = 30
-        if 'team_name' not in st.session_state:
-            st.session_state.team_name = "Meu Treino"
+        if 'total_sessions' not in self.state:
+            self.state.total_sessions = 4
+        if 'session_duration' not in self.state:
+            self.state.session_duration = 30
+        if 'team_name' not in self.state:
+            self.state.team_name = "Meu Treino"
+        if 'plan_type' not in self.state:
+            self.state.plan_type = "simples"
+        if 'work_duration' not in self.state:
+            self.state.work_duration = 40
+        if 'rest_duration' not in self.state:
+            self.state.rest_duration = 20
+        if 'rounds' not in self.state:
+            self.state.rounds = 8
+        if 'warmup_duration' not in self.state:
+            self.state.warmup_duration = 0
+        if 'cooldown_duration' not in self.state:
+            self.state.cooldown_duration = 0
         
-        # Estado do timer
-        if 'current_session' not in st.session_state:
-            st.session_state.current_session = 0
-        if 'is_running' not in st.session_state:
-            st.session_state.is_running = False
-        if 'end_time' not in st.session_state:
-            st.session_state.end_time = None
-        if 'time_remaining' not in st.session_state:
-            st.session_state.time_remaining = 0
-        if 'session_completed' not in st.session_state:
-            st.session_state.session_completed = False
+        # Estado do timer: uma sala privada, com fronteiras e avisos disparados em threads próprias
+        if 'timer' not in self.state:
+            self.state.timer = rooms.Room(
+                None,
+                clock=self.clock,
+                scheduler=self.scheduler,
+                cues=self.cues,
+                history=self.history,
+            )
+        if 'session_completed' not in self.state:
+            self.state.session_completed = False
+        if 'render_mode' not in self.state:
+            self.state.render_mode = "fragmento"
+        if 'tick_interval' not in self.state:
+            self.state.tick_interval = DEFAULT_TICK_INTERVAL
+        if 'tick_stats' not in self.state:
+            self.state.tick_stats = {}
+        if 'countdown_last_event' not in self.state:
+            self.state.countdown_last_event = None
+        if 'refresh_interval' not in self.state:
+            self.state.refresh_interval = None
+        if 'rerun_savings' not in self.state:
+            self.state.rerun_savings = None
+        if 'panel_renderer' not in self.state:
+            self.state.panel_renderer = render.PanelRenderer()
+
+        # Modo sala: várias telas acompanham o mesmo treino
+        if 'room_mode' not in self.state:
+            self.state.room_mode = False
+        if 'client_id' not in self.state:
+            self.state.client_id = uuid.uuid4().hex
+        if 'room_seen' not in self.state:
+            self.state.room_seen = {}
+
+        # Retomada (?retomar=token): só na primeira execução de uma sessão nova
+        if 'resume_token' not in self.state:
+            self.state.resume_token = None
+            if self.resume_store is not None:
+                self.resume_from_query()
 
     def create_ui(self):
+        timer = self.snapshot()
+
         # Logo e título quando não estiver rodando
-        if not st.session_state.is_running:
+        if not timer.is_running:
             col1, col2 = st.columns([1, 4])
             
             with col1:
-                # Verificar se o arquivo de logo existe
-                logo_path = os.path.join(os.path.dirname(__file__), "Assets", "logo.png")
-                if os.path.exists(logo_path):
-                    st.image(logo_path, width=80)
+                logo = branding.logo_png()
+                if logo is not None:
+                    st.image(logo, width=branding.LOGO_WIDTH)
                 else:
                     # Fallback para logo em emoji
                     st.markdown(
@@ -96,195 +158,162 @@ class TrainingTimer:
                 st.markdown("<p style='margin-top: -15px; color: #888;'>Controle preciso para seus exercícios</p>", unsafe_allow_html=True)
         
         # Configurações (apenas visíveis quando o timer não está rodando)
-        if not st.session_state.is_running:
+        if not timer.is_running:
             # Nome do Time
-            st.session_state.team_name = st.text_input("Nome do Treino", value=st.session_state.team_name)
+            self.state.team_name = st.text_input("Nome do Treino", value=self.state.team_name)
             
-            # Layout em duas colunas para os controles numéricos
-            col1, col2 = st.columns(2)
+            # Tipo de treino: sessões iguais ou programa intervalado
+            self.state.plan_type = st.radio(
+                "Tipo de treino",
+                options=list(PLAN_TYPES),
+                index=list(PLAN_TYPES).index(self.state.plan_type),
+                format_func=PLAN_TYPES.get,
+                horizontal=True,
+            )
+
+            if self.state.plan_type == "simples":
+                # Layout em duas colunas para os controles numéricos
+                col1, col2 = st.columns(2)
             
-            # Número de Sessões com input numérico
-            with col1:
-                st.markdown("<p style='margin-bottom: 5px;'><b>Número de Sessões</b></p>", unsafe_allow_html=True)
-                sessions_col1, sessions_col2, sessions_col3 = st.columns([1, 3, 1])
+                # Número de Sessões com input numérico
+                with col1:
+                    st.markdown("<p style='margin-bottom: 5px;'><b>Número de Sessões</b></p>", unsafe_allow_html=True)
+                    sessions_col1, sessions_col2, sessions_col3 = st.columns([1, 3, 1])
                 
-                with sessions_col1:
-                    if st.button("-", key="dec_sessions"):
-                        if st.session_state.total_sessions > 1:
-                            st.session_state.total_sessions -= 1
+                    with sessions_col1:
+                        if st.button("-", key="dec_sessions"):
+                            if self.state.total_sessions > 1:
+                                self.state.total_sessions -= 1
                 
-                with sessions_col2:
-                    st.session_state.total_sessions = st.number_input(
-                        "", 
-                        min_value=1, 
-                        max_value=30, 
-                        value=st.session_state.total_sessions,
-                        label_visibility="collapsed"
-                    )
+                    with sessions_col2:
+                        self.state.total_sessions = st.number_input(
+                            "", 
+                            min_value=1, 
+                            max_value=30, 
+                            value=self.state.total_sessions,
+                            label_visibility="collapsed"
+                        )
                 
-                with sessions_col3:
-                    if st.button("+", key="inc_sessions"):
-                        if st.session_state.total_sessions < 30:
-                            st.session_state.total_sessions += 1
+                    with sessions_col3:
+                        if st.button("+", key="inc_sessions"):
+                            if self.state.total_sessions < 30:
+                                self.state.total_sessions += 1
             
-            # Duração da Sessão com input numérico
-            with col2:
-                st.markdown("<p style='margin-bottom: 5px;'><b>Duração (segundos)</b></p>", unsafe_allow_html=True)
-                duration_col1, duration_col2, duration_col3 = st.columns([1, 3, 1])
+                # Duração da Sessão com input numérico
+                with col2:
+                    st.markdown("<p style='margin-bottom: 5px;'><b>Duração (segundos)</b></p>", unsafe_allow_html=True)
+                    duration_col1, duration_col2, duration_col3 = st.columns([1, 3, 1])
                 
-                with duration_col1:
-                    if st.button("-", key="dec_duration"):
-                        if st.session_state.session_duration > 10:
-                            st.session_state.session_duration -= 5
+                    with duration_col1:
+                        if st.button("-", key="dec_duration"):
+                            if self.state.session_duration > 10:
+                                self.state.session_duration -= 5
                 
-                with duration_col2:
-                    st.session_state.session_duration = st.number_input(
-                        "", 
-                        min_value=10, 
-                        max_value=300, 
-                        value=st.session_state.session_duration,
-                        step=5,
-                        label_visibility="collapsed"
-                    )
+                    with duration_col2:
+                        self.state.session_duration = st.number_input(
+                            "", 
+                            min_value=10, 
+                            max_value=300, 
+                            value=self.state.session_duration,
+                            step=5,
+                            label_visibility="collapsed"
+                        )
                 
-                with duration_col3:
-                    if st.button("+", key="inc_duration"):
-                        if st.session_state.session_duration < 300:
-                            st.session_state.session_duration += 5
-        # Atualizar o timer se estiver rodando
-        if st.session_state.is_running:
-            self.update_timer()
+                    with duration_col3:
+                        if st.button("+", key="inc_duration"):
+                            if self.state.session_duration < 300:
+                                self.state.session_duration += 5
+
+            else:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    self.state.work_duration = st.number_input(
+                        "Trabalho (s)", min_value=5, max_value=3600, step=5, value=self.state.work_duration
+                    )
+                    self.state.warmup_duration = st.number_input(
+                        "Aquecimento (s)", min_value=0, max_value=3600, step=5, value=self.state.warmup_duration
+                    )
+                with col2:
+                    self.state.rest_duration = st.number_input(
+                        "Descanso (s)", min_value=0, max_value=3600, step=5, value=self.state.rest_duration
+                    )
+                    self.state.cooldown_duration = st.number_input(
+                        "Desaquecimento (s)", min_value=0, max_value=3600, step=5, value=self.state.cooldown_duration
+                    )
+                with col3:
+                    self.state.rounds = st.number_input(
+                        "Rodadas", min_value=1, max_value=500, value=self.state.rounds
+                    )
+
+            # Modo sala: o timer pertence ao nome do treino e é compartilhado entre telas
+            self.state.room_mode = st.checkbox(
+                "Tela compartilhada (sala)",
+                value=self.state.room_mode,
+                help="Todas as telas com o mesmo nome de treino mostram o mesmo timer",
+            )
+
+            with st.expander("Opções avançadas"):
+                # Modo de exibição: fragmento, página inteira ou contagem no navegador
+                self.state.render_mode = st.selectbox(
+                    "Modo de exibição",
+                    options=list(RENDER_MODES),
+                    index=list(RENDER_MODES).index(self.state.render_mode),
+                    format_func=RENDER_MODES.get,
+                )
+                self.state.tick_interval = st.number_input(
+                    "Intervalo de atualização (segundos)",
+                    min_value=0.05,
+                    max_value=1.0,
+                    value=self.state.tick_interval,
+                    step=0.05,
+                    help="Usado nos segundos finais de cada sessão; no resto, a tela atualiza a cada troca de segundo",
+                )
+
+                # Custo medido por tick em cada modo, para comparação
+                if self.state.tick_stats:
+                    st.table({mode: stats.summary() for mode, stats in self.state.tick_stats.items()})
+                if self.state.rerun_savings:
+                    st.caption("Reruns do último treino em relação à cadência fixa")
+                    st.table({"treino": self.state.rerun_savings.summary()})
+
+            if self.history is not None and self.state.team_name.strip():
+                self.render_history()
+
+            # Painel de depuração (?debug=1): latência das fronteiras no processo
+            if DEBUG_PANEL or st.query_params.get("debug") == "1":
+                self.render_debug_panel()
+            if self.profiler is not None:
+                self.render_profile_panel()
+        # Treino concluído ou parado: o snapshot de retomada não serve mais
+        if not timer.is_running and self.state.resume_token:
+            self.forget_resume()
+
+        # Atualizar o timer (no modo fragmento, com o treino rodando, o próprio fragmento atualiza).
+        # Parado também: o scheduler pode ter concluído o treino antes deste rerun, e a conclusão
+        # e as trocas agrupadas ainda precisam ser sinalizadas
+        if not timer.is_running or self.state.render_mode != "fragmento":
+            timer = self.update_timer()
         
         # Formatar tempo para exibição
-        minutes, seconds = divmod(int(st.session_state.time_remaining), 60)
-        time_str = f"{minutes:02d}:{seconds:02d}"
+        time_str = render.format_clock(timer.time_remaining)
         
         # Container principal para o timer e informações
         timer_container = st.empty()  # Usar empty container para substituir conteúdo
         
         with timer_container.container():
-            if st.session_state.is_running:
-                # Título do treino em andamento
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; margin-bottom: 10px;">
-                        <h1 style="color: #0e1117; font-size: 36px;">{st.session_state.team_name}</h1>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Display do timer com estilo melhorado para modo ativo
-                timer_color = "#0e1117"
-                bg_color = "#f0f2f6"
-                border_color = "#e0e0e0"
-                
-                if st.session_state.time_remaining < 5:
-                    timer_color = "#FF0000"  # Vermelho quando faltam menos de 5 segundos
-                    bg_color = "#fff0f0"     # Fundo levemente avermelhado
-                    border_color = "#ffcccc" # Borda avermelhada
-                
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; background-color: {bg_color}; padding: 30px; 
-                         border-radius: 15px; margin: 20px 0; border: 2px solid {border_color}; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                        <h1 style="font-size: 120px; font-weight: bold; margin: 0; color: {timer_color};">{time_str}</h1>
-                        <h3 style="color: #555; margin-top: 10px;">Sessão {st.session_state.current_session} de {st.session_state.total_sessions}</h3>
-                    </div>
-                    """, 
-                    unsafe_allow_html=True
-                )
-                
-                # Informações adicionais em um painel mais compacto
-                st.markdown(
-                    f"""
-                    <div style="display: flex; justify-content: space-between; background-color: #f8f9fa; 
-                         padding: 15px; border-radius: 10px; margin: 15px 0; text-align: center;">
-                        <div style="flex: 1;">
-                            <p style="font-weight: bold; margin: 0; color: #555;">Sessão</p>
-                            <p style="font-size: 24px; margin: 0;">{st.session_state.current_session}/{st.session_state.total_sessions}</p>
-                        </div>
-                        <div style="flex: 1; border-left: 1px solid #ddd; border-right: 1px solid #ddd; padding: 0 10px;">
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Calcular tempo total restante
-                sessoes_restantes = st.session_state.total_sessions - st.session_state.current_session
-                tempo_total_restante = st.session_state.time_remaining + (sessoes_restantes * st.session_state.session_duration)
-                mins, secs = divmod(int(tempo_total_restante), 60)
-                
-                st.markdown(
-                    f"""
-                        <p style="font-weight: bold; margin: 0; color: #555;">Tempo Total</p>
-                        <p style="font-size: 24px; margin: 0;">{mins:02d}:{secs:02d}</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Calcular progresso em porcentagem
-                tempo_total = st.session_state.total_sessions * st.session_state.session_duration
-                tempo_decorrido = tempo_total - tempo_total_restante
-                progresso = int((tempo_decorrido / tempo_total) * 100) if tempo_total > 0 else 0
-                
-                st.markdown(
-                    f"""
-                        <div style="flex: 1;">
-                            <p style="font-weight: bold; margin: 0; color: #555;">Progresso</p>
-                            <p style="font-size: 24px; margin: 0;">{progresso}%</p>
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Barra de progresso
-                st.markdown(
-                    f"""
-                    <div style="background-color: #e0e0e0; border-radius: 10px; height: 10px; margin: 10px 0;">
-                        <div style="background-color: #4CAF50; width: {progresso}%; height: 10px; border-radius: 10px;"></div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Botão de parar centralizado e maior
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; margin-top: 20px;">
-                        <div style="background-color: #f44336; color: white; border: none; 
-                                padding: 12px 30px; text-align: center; display: inline-block; 
-                                font-size: 18px; margin: 4px 2px; border-radius: 8px;">
-                            PARAR TREINO
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Botão real do Streamlit (invisível mas funcional)
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col2:
-                    if st.button("Parar", key="stop_button", use_container_width=True):
-                        self.stop_timer()
-                
-                # Estilizar o botão para ficar invisível mas clicável sobre o botão visual
-                st.markdown(
-                    """
-                    <style>
-                    div[data-testid="stButton"] > button {
-                        opacity: 0;
-                        position: relative;
-                        top: -60px;
-                        height: 50px;
-                        cursor: pointer;
-                    }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
+            if timer.is_running and self.state.render_mode == "cliente":
+                self.render_countdown(timer)
+
+            elif timer.is_running and self.state.render_mode == "fragmento":
+                # Só o painel ao vivo é reexecutado, devagar no meio da sessão e rápido no final
+                self.state.refresh_interval = refresh_policy.fragment_interval(
+                    timer, self.state.tick_interval
                 )
-                
+                st.fragment(run_every=self.state.refresh_interval)(self.live_panel)()
+
+            elif timer.is_running:
+                self.run_server_loop(timer)
+
             else:
                 # Display do timer com estilo melhorado para modo inativo
                 st.markdown(
@@ -297,57 +326,260 @@ class TrainingTimer:
                 )
                 
                 # Botão de iniciar
-                if st.button("Iniciar Treino", use_container_width=True):
+                if st.button("Iniciar Treino", width="stretch"):
                     self.start_timer()
+                    if self.snapshot().is_running:
+                        st.rerun()
             
             # Mensagem de conclusão
-            if st.session_state.session_completed:
+            if self.state.session_completed:
                 st.success("Treino concluído!")
                 st.balloons() # Adiciona um efeito visual de celebração
-                st.session_state.session_completed = False
+                self.state.session_completed = False
+
+    def live_panel(self):
+        # Reruns do fragmento não passam por main(): entram nas métricas e no perfil aqui
+        metrics.registry.counter("timer_reruns_total", "Execuções do script", tipo="fragmento").inc()
+        if self.profiler is None:
+            return self.update_live_panel()
+        with self.profiler.profile():
+            return self.update_live_panel()
+
+    def update_live_panel(self):
+        started = time.perf_counter()
+        timer = self.update_timer()
+        if refresh_policy.fragment_interval(timer, self.state.tick_interval) != self.state.refresh_interval:
+            # Treino concluído/parado ou mudança de cadência: redesenhar a página inteira
+            st.rerun()
+        self.render_running_panel(timer)
+        self.record_tick("fragmento", time.perf_counter() - started)
+
+    def run_server_loop(self, timer):
+        # Um único script run com placeholders fixos: cada tick reenvia só os blocos que mudaram
+        self.state.panel_renderer.reset()
+        slots = {block: st.empty() for block in render.BLOCKS}
+        self.render_blocks(timer, slots)
+        self.render_controls()
+        started = SCRIPT_STARTED
+        while True:
+            self.record_tick("servidor", time.perf_counter() - started)
+            # Próximo tick logo após a troca do segundo exibido, ou na cadência rápida no final
+            self.idle(refresh_policy.next_interval(timer, self.state.tick_interval))
+            started = time.perf_counter()
+            timer = self.update_timer()
+            if not timer.is_running:
+                # Treino concluído ou parado: redesenhar a página inteira
+                st.rerun()
+            self.render_blocks(timer, slots)
+
+    def render_running_panel(self, timer):
+        self.render_blocks(timer)
+        self.render_controls()
+
+    def render_blocks(self, timer, slots=None):
+        # Sem placeholders (fragmento) todos os blocos são reemitidos, mas só os alterados são reformatados
+        self.html_bytes = 0
+        renderer = self.state.panel_renderer
+        for block, values in render.panel_values(self.state.team_name, timer, self.can_control()).items():
+            html, changed = renderer.html(block, values)
+            if slots is None:
+                self._html(html)
+            elif changed:
+                self._html(html, slots[block])
+
+    def render_controls(self):
+        # Espectadores de uma sala não controlam o timer
+        if not self.can_control():
+            st.caption("Somente visualização: o treino é controlado por outra tela")
+            return
+
+        # Botão real do Streamlit (invisível mas funcional)
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col2:
+            if st.button("Parar", key="stop_button", width="stretch"):
+                self.stop_timer()
+                st.rerun()
         
-        # Rerun para atualização em tempo real - movido para fora do container
-        if st.session_state.is_running:
-            time.sleep(0.1)  # Pequena pausa para não sobrecarregar
+        # Estilizar o botão para ficar invisível mas clicável sobre o botão visual
+        self._html(render.STOP_STYLE)
+
+    def render_history(self):
+        # Resumo dos últimos 30 dias e treinos recentes, lidos dos índices por equipe
+        team = self.state.team_name.strip()
+        with st.expander(f"Histórico: {team}"):
+            totals = self.history.totals(team)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Treinos (30 dias)", totals["treinos"])
+            rate = totals["taxa_conclusao"]
+            col2.metric("Concluídos", "—" if rate is None else f"{rate:.0%}")
+            col3.metric("Tempo total", f"{totals['tempo_total'] / 3600:.1f} h")
+            recent = self.history.recent(team)
+            if recent:
+                status = {1: "concluído", 0: "parado", None: "em andamento"}
+                st.dataframe(
+                    [
+                        {
+                            "início": time.strftime("%d/%m %H:%M", time.localtime(row["inicio"])),
+                            "sessões": f"{row['sessoes']}/{row['sessoes_previstas']}",
+                            "previsto": render.format_clock(row["duracao_prevista"]),
+                            "real": "—" if row["duracao_real"] is None else render.format_clock(row["duracao_real"]),
+                            "situação": status[row["concluido"]],
+                            "atraso máx. (ms)": row["atraso_max_ms"],
+                        }
+                        for row in recent
+                    ],
+                    hide_index=True,
+                    width="stretch",
+                )
+            if self.history.last_error:
+                st.caption(f"Falha ao gravar o histórico: {self.history.last_error}")
+
+    def render_debug_panel(self):
+        with st.expander("Depuração: precisão do timer", expanded=True):
+            st.caption("Atraso em relação ao fim programado de cada sessão (ms), agregado no processo")
+            st.table(instrumentation.recorder.summary())
+            st.caption("Áudio")
+            st.table({"beep": self.audio.stats.summary()})
+            if metrics.server_error:
+                st.warning(f"Endpoint /metrics desligado: não foi possível abrir {metrics.server_error}")
+            if workout_history.open_error:
+                st.warning(f"Histórico desligado: não foi possível abrir {workout_history.open_error}")
+            if resume.open_error:
+                st.warning(f"Retomada desligada: não foi possível abrir {resume.open_error}")
+            if self.scheduler is not None and self.scheduler.errors:
+                st.warning(f"{self.scheduler.errors} erro(s) nos disparos do scheduler; último: {self.scheduler.last_error}")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    "Exportar JSON",
+                    instrumentation.recorder.to_json(),
+                    file_name="latencias.json",
+                    mime="application/json",
+                )
+            with col2:
+                st.download_button(
+                    "Exportar CSV",
+                    instrumentation.recorder.to_csv(),
+                    file_name="latencias.csv",
+                    mime="text/csv",
+                )
+
+    def render_profile_panel(self):
+        with st.expander("Perfil dos reruns", expanded=True):
+            st.caption(
+                f"{self.profiler.runs} reruns, {self.profiler.samples} amostras; "
+                "% das amostras em cada função (tempo próprio)"
+            )
+            st.table(self.profiler.top())
+            st.download_button(
+                "Exportar pilhas (flame graph)",
+                self.profiler.collapsed(),
+                file_name="perfil.collapsed",
+                mime="text/plain",
+            )
+
+    def idle(self, seconds):
+        # A espera entre ticks fica fora do perfil, que mede só o trabalho dos reruns
+        if self.profiler is None:
+            time.sleep(seconds)
+            return
+        with self.profiler.paused():
+            time.sleep(seconds)
+
+    def _html(self, html, target=st):
+        target.markdown(html, unsafe_allow_html=True)
+        self.html_bytes += len(html.encode("utf-8"))
+
+    def record_tick(self, mode, elapsed):
+        stats = self.state.tick_stats.setdefault(mode, TickStats())
+        stats.record(elapsed, self.html_bytes)
+        metrics.registry.histogram(
+            "timer_tick_seconds", "Tempo de script de cada tick do timer em andamento", modo=mode
+        ).observe(elapsed * 1000)
+        if self.state.rerun_savings:
+            self.state.rerun_savings.record(self.clock())
+
+    def render_countdown(self, timer):
+        # O navegador conta sozinho; o servidor só volta a rodar nas fronteiras e ao parar
+        # Componente importado só no modo navegador: declará-lo carrega o pacote de componentes
+        from countdown import countdown
+
+        event = countdown(
+            team_name=self.state.team_name,
+            session=timer.current_session,
+            durations=[segment.duration for segment in timer.plan.segments],
+            labels=[segment.label for segment in timer.plan.segments],
+            remaining=timer.time_remaining,
+            anchor=f"{self.anchor()}:{timer.current_session}",
+            can_control=self.can_control(),
+            key="countdown",
+        )
+
+        if not event or event.get("id") == self.state.countdown_last_event:
+            return
+        self.state.countdown_last_event = event.get("id")
+
+        # Fronteiras já foram tratadas por update_timer no início deste rerun
+        if event.get("event") == "stop" and self.can_control():
+            self.stop_timer()
             st.rerun()
 
+    def room(self, create=False):
+        # Sala compartilhada do treino no modo sala; senão, a sala privada desta sessão.
+        # A compartilhada só é criada ao iniciar ou retomar; até lá a tela mostra a privada, parada
+        name = self.state.team_name.strip()
+        if self.state.room_mode and name:
+            room = rooms.registry.get(name) if create else rooms.registry.find(name)
+            if room is not None:
+                return room
+        return self.state.timer
+
+    def can_control(self):
+        return self.room().can_control(self.state.client_id)
+
+    def anchor(self):
+        room = self.room()
+        return f"{room.name}:{room.generation}"
+
+    def snapshot(self):
+        return self.room().snapshot()
+
     def update_timer(self):
-        # Calcular tempo restante
-        if st.session_state.end_time:
-            now = datetime.now()
-            remaining = (st.session_state.end_time - now).total_seconds()
-            
-            if remaining <= 0:
-                # Sessão atual terminou
-                self.play_beep()
-                
-                # Verificar se há mais sessões
-                if st.session_state.current_session < st.session_state.total_sessions:
-                    # Iniciar próxima sessão
-                    st.session_state.current_session += 1
-                    st.session_state.end_time = datetime.now().timestamp() + st.session_state.session_duration
-                    st.session_state.end_time = datetime.fromtimestamp(st.session_state.end_time)
-                    st.session_state.time_remaining = st.session_state.session_duration
-                else:
-                    # Treino completo
-                    self.stop_timer()
-                    st.session_state.session_completed = True
-            else:
-                st.session_state.time_remaining = remaining
+        # As fronteiras são disparadas pelo scheduler; aqui só se lê o snapshot
+        room = self.room()
+        timer = room.snapshot()
+
+        seen_completions, seen_skipped = self.state.room_seen.setdefault(
+            room.name, (room.completions, room.skipped)
+        )
+        if room.skipped > seen_skipped:
+            st.toast(f"{room.skipped - seen_skipped} troca(s) de sessão ocorreram durante um atraso")
+        if room.completions > seen_completions:
+            self.state.session_completed = True
+        self.state.room_seen[room.name] = (room.completions, room.skipped)
+        return timer
 
     def start_timer(self):
         # Validações
-        if not st.session_state.team_name.strip():
+        if not self.state.team_name.strip():
             st.warning("Digite o nome do treino")
             return
 
+        # Preparar os avisos e recarregar o beep só se o arquivo mudou (fora do caminho de cada tick)
+        self.audio.preload()
+
         # Configurar estado inicial
-        st.session_state.current_session = 1
-        st.session_state.time_remaining = st.session_state.session_duration
-        st.session_state.is_running = True
-        st.session_state.end_time = datetime.now().timestamp() + st.session_state.session_duration
-        st.session_state.end_time = datetime.fromtimestamp(st.session_state.end_time)
-        st.session_state.session_completed = False
+        room = self.room(create=True)
+        try:
+            room.start(self.state.client_id, self.build_plan(), team=self.state.team_name.strip())
+        except rooms.ControlError as e:
+            st.warning(str(e))
+            return
+        self.state.room_seen[room.name] = (room.completions, room.skipped)
+        self.state.session_completed = False
+        self.state.rerun_savings = RerunSavings(self.state.tick_interval, self.clock())
+        if self.resume_store is not None:
+            self.save_resume(room)
         
         # Adicionar JavaScript para rolar para o topo da página
         st.markdown(
@@ -358,18 +590,92 @@ class TrainingTimer:
             """,
             unsafe_allow_html=True
         )
+
+    def build_plan(self):
+        # Planos compilados ficam em cache por configuração
+        if self.state.plan_type == "intervalado":
+            return interval_plan(
+                self.state.work_duration,
+                self.state.rest_duration,
+                self.state.rounds,
+                self.state.warmup_duration,
+                self.state.cooldown_duration,
+            )
+        return simple_plan(self.state.total_sessions, self.state.session_duration)
+
+    def save_resume(self, room):
+        # Snapshot mínimo gravado só no início: configuração do plano e início em relógio de parede
+        state = room.engine.state
+        started = time.time() - (self.clock() - state.start_time)
+        token = self.state.resume_token or uuid.uuid4().hex
+        snapshot = {
+            "equipe": self.state.team_name,
+            "sala": self.state.room_mode,
+            "cliente": self.state.client_id,
+            "tipo": self.state.plan_type,
+            "plano": {key: self.state[key] for key in PLAN_SETTINGS[self.state.plan_type]},
+            "inicio": started,
+            "fim": started + state.plan.total_duration,
+        }
+        try:
+            self.resume_store.save(token, snapshot)
+        except OSError:
+            return
+        self.resume_store.track(token, room)
+        self.state.resume_token = token
+        st.query_params["retomar"] = token
+
+    def resume_from_query(self):
+        # Sessão nova com token na URL: reanexar à sala viva do treino, ou, se o servidor reiniciou,
+        # reconstruí-la direto na sessão atual
+        token = st.query_params.get("retomar")
+        if not token:
+            return
+        snapshot = self.resume_store.load(token)
+        if snapshot is None or snapshot.get("tipo") not in PLAN_SETTINGS:
+            del st.query_params["retomar"]
+            return
+        self.state.team_name = snapshot["equipe"]
+        self.state.room_mode = snapshot["sala"]
+        self.state.client_id = snapshot["cliente"]
+        self.state.plan_type = snapshot["tipo"]
+        for key, value in snapshot["plano"].items():
+            if key in PLAN_SETTINGS[snapshot["tipo"]]:
+                self.state[key] = value
+
+        live = self.resume_store.live_room(token)
+        if live is not None:
+            # Mesmo processo (página recarregada, outra aba): o treino continua na sala original
+            if not self.state.room_mode:
+                self.state.timer = live
+            room = live
+        else:
+            room = self.room(create=True)
+            started = self.clock() - (time.time() - snapshot["inicio"])
+            if not room.restore(self.state.client_id, self.build_plan(), started, team=self.state.team_name.strip()):
+                self.resume_store.discard(token)
+                del st.query_params["retomar"]
+                return
+            self.resume_store.track(token, room)
+        self.state.resume_token = token
+        self.state.room_seen[room.name] = (room.completions, room.skipped)
+        self.state.rerun_savings = RerunSavings(self.state.tick_interval, self.clock())
+
+    def forget_resume(self):
+        self.resume_store.discard(self.state.resume_token)
+        self.state.resume_token = None
+        if "retomar" in st.query_params:
+            del st.query_params["retomar"]
+
     def stop_timer(self):
-        st.session_state.is_running = False
-        st.session_state.current_session = 0
-        st.session_state.time_remaining = 0
-        st.session_state.end_time = None
-
-    def play_beep(self):
-        if self.beep_sound:
-            try:
-                self.beep_sound.play()
-            except:
-                pass
+        try:
+            self.room().stop(self.state.client_id)
+        except rooms.ControlError as e:
+            st.warning(str(e))
+
+def run(timer):
+    timer.initialize_session_state()  # Add this line to initialize session state
+    timer.create_ui()
 
 def main():
     st.set_page_config(
@@ -378,9 +684,21 @@ def main():
         layout="centered"
     )
     
+    # Endpoint /metrics do processo (TIMER_METRICS_PORT)
+    metrics.start_server()
+    metrics.registry.counter("timer_reruns_total", "Execuções do script", tipo="completo").inc()
+
     timer = TrainingTimer()
-    timer.initialize_session_state()  # Add this line to initialize session state
-    timer.create_ui()
+    if PROFILE or st.query_params.get("profile") == "1":
+        # Importado só com o perfil ligado: desligado, o custo é esta verificação
+        import profiling
+
+        timer.profiler = profiling.sampler()
+        with timer.profiler.profile():
+            run(timer)
+    else:
+        run(timer)
+    timer.audio.warm_up()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
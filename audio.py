@@ -0,0 +1,157 @@
+import os
+import threading
+
+import tones
+from sound_assets import SoundCache, beep_candidates
+
+# Parâmetros do mixer: buffer pequeno reduz a latência entre play() e o som sair
+AUDIO_FREQUENCY = int(os.environ.get("TIMER_AUDIO_FREQUENCY", "44100"))
+AUDIO_BUFFER = int(os.environ.get("TIMER_AUDIO_BUFFER", "512"))
+
+# Canal reservado para os avisos do timer, fora do alcance de Sound.play()
+CUE_CHANNEL = 0
+
+
+def _pygame():
+    # Importado só quando o mixer é usado pela primeira vez, sem o banner de boas-vindas
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    return pygame
+
+
+class AudioStats:
+    __slots__ = ("plays", "failures", "unavailable", "last_error")
+
+    def __init__(self):
+        self.plays = 0
+        self.failures = 0
+        self.unavailable = 0
+        self.last_error = None
+
+    def summary(self):
+        return {
+            "reproduzidos": self.plays,
+            "falhas": self.failures,
+            "sem_audio": self.unavailable,
+            "ultimo_erro": self.last_error or "",
+        }
+
+
+class AudioEngine:
+    """Mixer persistente do processo com buffers de som já decodificados.
+
+    O mixer é inicializado uma vez, com buffer configurável, e os avisos
+    tocam num canal reservado. `play()` só entrega o buffer ao mixer, sem
+    bloquear o tick; falhas viram contadores em vez de sumirem.
+    """
+
+    def __init__(self, frequency=AUDIO_FREQUENCY, buffer=AUDIO_BUFFER):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.stats = AudioStats()
+        self.error = None
+        self._cues = {}
+        self._channel = None
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._warmup = None
+
+    @property
+    def available(self):
+        return self._ensure_mixer()
+
+    def register(self, cue, candidates):
+        # Cada aviso é um SoundCache: decodificado uma vez, revalidado sob demanda
+        self._cues[cue] = SoundCache(candidates, self._decode)
+
+    def register_tone(self, cue, notes):
+        # Aviso sintetizado: gerado uma vez a partir do cache de PCM, sem arquivo
+        self._cues[cue] = tones.ToneCue(notes, self._synthesize)
+
+    def sound(self, cue):
+        return self._cues[cue].get()
+
+    def cue_error(self, cue):
+        return self.error or self._cues[cue].error
+
+    def revalidate(self, cue):
+        return self._cues[cue].revalidate()
+
+    def load_times(self):
+        # Tempo gasto decodificando/sintetizando cada aviso (segundos)
+        return {cue: cache.load_time for cue, cache in self._cues.items()}
+
+    def preload(self):
+        # Decodifica/sintetiza todos os avisos fora do caminho do tick
+        for cue in self._cues.values():
+            cue.revalidate()
+
+    def warm_up(self):
+        # Mixer e avisos preparados numa thread, fora do caminho da primeira página
+        if self._warmup is None:
+            with self._lock:
+                if self._warmup is None:
+                    self._warmup = threading.Thread(target=self.preload, name="timer-audio-warmup", daemon=True)
+                    self._warmup.start()
+        return self._warmup
+
+    def play(self, cue):
+        sound = self._cues[cue].get() if self._ensure_mixer() else None
+        if sound is None:
+            self.stats.unavailable += 1
+            return False
+        try:
+            self._channel.play(sound)
+        except Exception as e:
+            self.stats.failures += 1
+            self.stats.last_error = str(e)
+            return False
+        self.stats.plays += 1
+        return True
+
+    def _ensure_mixer(self):
+        if self._initialized:
+            return self._channel is not None
+        with self._lock:
+            if not self._initialized:
+                try:
+                    pygame = _pygame()
+                    if not pygame.mixer.get_init():
+                        pygame.mixer.pre_init(self.frequency, -16, 2, self.buffer)
+                        pygame.mixer.init()
+                    pygame.mixer.set_reserved(CUE_CHANNEL + 1)
+                    self._channel = pygame.mixer.Channel(CUE_CHANNEL)
+                except Exception as e:
+                    self.error = f"Não foi possível inicializar o sistema de áudio: {e}"
+                    self.stats.last_error = str(e)
+                # Só depois da tentativa terminar: quem lê a flag sem o lock espera pelo resultado
+                self._initialized = True
+        return self._channel is not None
+
+    def _decode(self, path):
+        if not self._ensure_mixer():
+            raise RuntimeError(self.error)
+        return _pygame().mixer.Sound(path)
+
+    def _synthesize(self, notes):
+        if not self._ensure_mixer():
+            raise RuntimeError(self.error)
+        return tones.make_sound(notes)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    # Engine de áudio do processo, criado na primeira utilização
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = AudioEngine()
+                engine.register("beep", beep_candidates)
+                for cue, notes in tones.CUES.items():
+                    engine.register_tone(cue, notes)
+                _engine = engine
+    return _engine
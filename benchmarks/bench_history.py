@@ -0,0 +1,104 @@
+"""Benchmark do histórico de treinos: custo de enfileirar eventos e agregados sobre milhões de linhas.
+
+Preenche um banco temporário com `--rows` treinos sintéticos espalhados
+por `--teams` equipes e um ano de dias, e mede a mediana das consultas da
+tela de histórico (totais e treinos recentes de uma equipe) e do agregado
+por dia de todas as equipes. Também mede o custo por evento no caminho do
+timer (só a fila) e a vazão da gravação em lote.
+
+Uso: python benchmarks/bench_history.py [--rows 1000000] [--teams 200] [--events 20000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from workout_history import WorkoutHistory  # noqa: E402
+from workout_plan import simple_plan  # noqa: E402
+
+
+def fill(history, rows, teams, seed):
+    # Inserção direta em lotes: o preenchimento não é o que se mede
+    rng = random.Random(seed)
+    now = time.time()
+    with history._connect() as db:
+        batch = []
+        for _ in range(rows):
+            started = now - rng.uniform(0, 365 * 86400)
+            planned = rng.choice((120, 300, 600, 1200))
+            completed = int(rng.random() < 0.8)
+            actual = planned if completed else rng.uniform(0, planned)
+            batch.append((
+                f"Equipe {rng.randrange(teams)}", time.strftime("%Y-%m-%d", time.localtime(started)),
+                started, started + actual, 4, 4 if completed else 1, planned, actual, completed, 2.0, 1.0,
+            ))
+            if len(batch) == 50_000:
+                db.executemany("INSERT INTO treinos VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        db.executemany("INSERT INTO treinos VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        db.execute("ANALYZE")
+
+
+def median_ms(function, repeat=20):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def enqueue_and_write(history, events):
+    # Treinos de 4 sessões: 6 eventos cada, enfileirados como o Room faz
+    plan = simple_plan(4, 30)
+    started = time.perf_counter()
+    count = 0
+    for run in range(events // 6):
+        key = history.start("Equipe fila", plan, 0.0, time.time())
+        for session in range(1, 5):
+            history.session_ended(key, session, 0, session * 30.0)
+        history.finish(key, 120.0, True)
+        count += 6
+    enqueued = time.perf_counter() - started
+    started = time.perf_counter()
+    history.flush()
+    written = time.perf_counter() - started
+    return {
+        "enfileirar_us_por_evento": round(enqueued / count * 1e6, 3),
+        "gravacao_eventos_por_s": round(count / written),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Janela longa: a thread de gravação não concorre com a medida, que grava com flush()
+        history = WorkoutHistory(os.path.join(directory, "historico.db"), flush_interval=3600)
+        started = time.perf_counter()
+        fill(history, args.rows, args.teams, args.seed)
+        result = {"linhas": args.rows, "preenchimento_s": round(time.perf_counter() - started, 1)}
+
+        team = "Equipe 0"
+        result["totais_equipe_ms"] = median_ms(lambda: history.totals(team, days=365))
+        result["recentes_equipe_ms"] = median_ms(lambda: history.recent(team))
+        result["por_dia_equipe_ms"] = median_ms(lambda: history.daily(team, days=365))
+        result["por_dia_todas_30d_ms"] = median_ms(lambda: history.daily(days=30), repeat=5)
+        result.update(enqueue_and_write(history, args.events))
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
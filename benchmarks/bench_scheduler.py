@@ -0,0 +1,103 @@
+"""Benchmark do scheduler de fronteiras: 10k timers concorrentes em um núcleo.
+
+Uso: python benchmarks/bench_scheduler.py [--timers 10000] [--span 3.0]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import Scheduler, TimerHandle, TimingWheel  # noqa: E402
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def bench_insert_cancel(timers):
+    wheel = TimingWheel(start=0.0)
+    deadlines = [random.uniform(0.01, 600.0) for _ in range(timers)]
+
+    started = time.perf_counter()
+    handles = [wheel.insert(TimerHandle(deadline, None)) for deadline in deadlines]
+    insert_ns = (time.perf_counter() - started) / timers * 1e9
+
+    started = time.perf_counter()
+    for handle in handles:
+        wheel.cancel(handle)
+    cancel_ns = (time.perf_counter() - started) / timers * 1e9
+    return insert_ns, cancel_ns
+
+
+def bench_virtual_advance(timers, resolution=0.01):
+    # Sessões de 30-300 s reagendadas a cada fronteira, como timers de treino reais
+    wheel = TimingWheel(resolution, start=0.0)
+    for _ in range(timers):
+        wheel.insert(TimerHandle(random.uniform(30, 300), None))
+
+    simulated = 600.0
+    fired = 0
+    started = time.perf_counter()
+    now = 0.0
+    while now < simulated:
+        now += resolution
+        for handle in wheel.advance(now):
+            fired += 1
+            handle.deadline = now + random.uniform(30, 300)
+            wheel.insert(handle)
+    elapsed = time.perf_counter() - started
+    ticks = int(simulated / resolution)
+    return elapsed / ticks * 1e6, fired, elapsed / simulated
+
+
+def bench_threaded(timers, span):
+    scheduler = Scheduler()
+    lateness = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def fire(handle):
+        late = scheduler.clock() - handle.deadline
+        with lock:
+            lateness.append(late)
+            if len(lateness) == timers:
+                done.set()
+
+    cpu_started = time.process_time()
+    base = scheduler.clock() + 0.2
+    for _ in range(timers):
+        scheduler.schedule(base + random.uniform(0, span), fire)
+    done.wait(span + 5)
+    cpu = time.process_time() - cpu_started
+    scheduler.shutdown()
+    return lateness, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=10000)
+    parser.add_argument("--span", type=float, default=3.0, help="janela (s) dos prazos no teste com thread")
+    args = parser.parse_args()
+    random.seed(42)
+
+    insert_ns, cancel_ns = bench_insert_cancel(args.timers)
+    print(f"insert: {insert_ns:8.0f} ns/op   cancel: {cancel_ns:8.0f} ns/op   ({args.timers} timers)")
+
+    tick_us, fired, duty = bench_virtual_advance(args.timers)
+    print(f"advance: {tick_us:8.1f} us/tick   {fired} fronteiras em 600 s simulados   uso de CPU {duty:.2%}")
+
+    lateness, cpu = bench_threaded(args.timers, args.span)
+    ms = [value * 1000 for value in lateness]
+    print(
+        f"thread: {len(ms)}/{args.timers} disparos   atraso p50 {percentile(ms, 0.5):.2f} ms   "
+        f"p99 {percentile(ms, 0.99):.2f} ms   max {max(ms):.2f} ms   CPU {cpu:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
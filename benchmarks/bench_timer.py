@@ -0,0 +1,241 @@
+"""Benchmark e regressão da lógica do timer com relógio virtual, sem navegador e sem sleeps.
+
+Dirige `TrainingTimer` (start_timer, update_timer, stop_timer) com um
+session_state falso e um relógio virtual, na cadência da política de
+atualização, e compara o resultado com a linha de base salva.
+
+O desempenho é comparado como custo relativo: tempo por tick dividido
+pelo tempo de um laço de calibração de Python puro medido na mesma
+máquina, então a linha de base vale entre máquinas de velocidades
+diferentes (ticks/s absoluto é só informativo). `blocos_retidos_por_tick`
+é o saldo de blocos alocados e não liberados ao fim da carga: pega
+vazamentos no caminho do tick, não o total de alocações.
+
+Uso: python benchmarks/bench_timer.py [--workouts 300] [--repeat 3] [--save-baseline] [--tolerance 0.3]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import refresh_policy  # noqa: E402
+import render  # noqa: E402
+from Timer import TrainingTimer  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_timer.json")
+
+# Cadência rápida da política de atualização nos segundos finais
+FAST_INTERVAL = 0.1
+
+# Iterações do laço de calibração intercaladas depois de cada treino simulado
+CALIBRATION_LOOPS = 2_000
+
+
+class VirtualClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSessionState(dict):
+    # Mesmo acesso por atributo e por chave do st.session_state
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def _step(value):
+    return value % 7
+
+
+def calibrate(state):
+    # Carga fixa com o mesmo tipo de trabalho do tick (atributos, dicionários, chamadas);
+    # devolve a duração da rajada
+    started = time.perf_counter()
+    for i in range(CALIBRATION_LOOPS):
+        state.total = state.total + _step(i)
+    return time.perf_counter() - started
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def random_workout(rng):
+    if rng.random() < 0.5:
+        return {"plan_type": "simples", "total_sessions": rng.randint(2, 10), "session_duration": rng.randrange(30, 301, 5)}
+    return {
+        "plan_type": "intervalado",
+        "work_duration": rng.randrange(20, 121, 5),
+        "rest_duration": rng.randrange(0, 61, 5),
+        "rounds": rng.randint(2, 12),
+        "warmup_duration": rng.choice((0, 60, 120)),
+        "cooldown_duration": rng.choice((0, 60)),
+    }
+
+
+def run(workouts, seed):
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    state = FakeSessionState()
+    timer = TrainingTimer(clock=clock, state=state, background=False)
+    timer.initialize_session_state()
+    renderer = render.PanelRenderer()
+    # Áudio preparado antes da medição, como o app faz depois da primeira página
+    timer.audio.warm_up().join()
+
+    ticks = 0
+    simulated = 0.0
+    drift = []
+    errors = []
+    completed = stopped = 0
+    # A velocidade da máquina oscila ao longo da rodada: a calibração é medida em rajadas
+    # intercaladas com os treinos, para que as duas medidas passem pelas mesmas fases
+    calibration = FakeSessionState(total=0)
+    calibration_time = elapsed = 0.0
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+
+    for number in range(workouts):
+        started = time.perf_counter()
+        state.update(random_workout(rng))
+        timer.start_timer()
+        room = timer.room()
+        plan = room.engine.state.plan
+        start = room.engine.state.start_time
+        # Alguns treinos são interrompidos no meio para exercitar stop_timer
+        stop_at = start + plan.total_duration * rng.random() if rng.random() < 0.1 else None
+        expected_session = 1
+
+        snapshot = timer.update_timer()
+        while snapshot.is_running:
+            clock.now += refresh_policy.next_interval(snapshot, FAST_INTERVAL)
+            if stop_at is not None and clock.now >= stop_at:
+                timer.stop_timer()
+                stopped += 1
+                break
+            snapshot = timer.update_timer()
+            for block, values in render.panel_values(state.team_name, snapshot).items():
+                renderer.html(block, values)
+            ticks += 1
+
+            session = snapshot.current_session if snapshot.is_running else len(plan) + 1
+            if session != expected_session:
+                if session != expected_session + 1:
+                    errors.append(f"treino {number}: sessão {expected_session} -> {session}")
+                drift.append((clock.now - (start + plan.offsets[expected_session - 1])) * 1000)
+                expected_session = session
+
+        if stop_at is None:
+            completed += 1
+            if not state.session_completed:
+                errors.append(f"treino {number}: conclusão não sinalizada")
+            if expected_session != len(plan) + 1:
+                errors.append(f"treino {number}: terminou na sessão {expected_session} de {len(plan)}")
+        elif timer.snapshot().is_running:
+            errors.append(f"treino {number}: continuou rodando depois de parar")
+        simulated += clock.now - start
+        state.session_completed = False
+        elapsed += time.perf_counter() - started
+        calibration_time += calibrate(calibration)
+
+    gc.collect()
+    blocks_after = sys.getallocatedblocks()
+
+    room = timer.room()
+    if room.completions != completed:
+        errors.append(f"{room.completions} conclusões contadas, {completed} esperadas")
+    if room.skipped:
+        errors.append(f"{room.skipped} fronteiras agrupadas sem atraso real")
+
+    return {
+        "treinos": workouts,
+        "concluidos": completed,
+        "parados": stopped,
+        "horas_simuladas": round(simulated / 3600, 2),
+        "ticks": ticks,
+        "ticks_por_s": round(ticks / elapsed),
+        "us_por_tick": round(elapsed / ticks * 1e6, 3),
+        "calibracao_us": round(calibration_time / (workouts * CALIBRATION_LOOPS) * 1e6, 4),
+        "custo_relativo": round(elapsed / ticks / (calibration_time / (workouts * CALIBRATION_LOOPS)), 2),
+        "blocos_retidos_por_tick": round((blocks_after - blocks_before) / ticks, 4),
+        "desvio_medio_ms": round(sum(drift) / len(drift), 3),
+        "desvio_p99_ms": round(percentile(drift, 0.99), 3),
+        "desvio_max_ms": round(max(drift), 3),
+        "erros": errors,
+    }
+
+
+def compare(result, baseline, tolerance):
+    # Falhas de correção sempre reprovam; desempenho reprova fora da tolerância
+    failures = list(result["erros"])
+    if result["custo_relativo"] > baseline["custo_relativo"] * (1 + tolerance):
+        failures.append(
+            f"custo_relativo subiu: {result['custo_relativo']} > {baseline['custo_relativo']} (+{tolerance:.0%})"
+        )
+    if result["blocos_retidos_por_tick"] > baseline["blocos_retidos_por_tick"] + 0.01:
+        failures.append(
+            f"blocos_retidos_por_tick subiu: {result['blocos_retidos_por_tick']} > {baseline['blocos_retidos_por_tick']}"
+        )
+    for key in ("desvio_p99_ms", "desvio_max_ms"):
+        if result[key] > baseline[key] + 1.0:
+            failures.append(f"{key} subiu: {result[key]} > {baseline[key]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="rodadas; vale a de menor custo relativo")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="aumento aceitável do custo relativo")
+    args = parser.parse_args()
+
+    # Sem servidor, o Streamlit avisa a cada chamada de st.* (vários loggers, com handlers próprios)
+    logging.disable(logging.WARNING)
+
+    # A mesma carga várias vezes: vale a rodada de menor custo relativo
+    results = [run(args.workouts, args.seed) for _ in range(args.repeat)]
+    result = min(results, key=lambda item: item["custo_relativo"])
+    result["erros"] = [error for item in results for error in item["erros"]]
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.save_baseline:
+        if result["erros"]:
+            sys.exit("Linha de base não salva: há erros de correção")
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in result.items() if key != "erros"}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Linha de base salva em {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        sys.exit("Sem linha de base: rode com --save-baseline")
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if "custo_relativo" not in baseline:
+        sys.exit("Linha de base em formato antigo: rode com --save-baseline")
+    if baseline["treinos"] != result["treinos"]:
+        print(f"Aviso: linha de base com {baseline['treinos']} treinos; comparando assim mesmo")
+    failures = compare(result, baseline, args.tolerance)
+    if failures:
+        print("\nREGRESSÃO:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nOK: dentro da linha de base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Teste de carga: N sessões do app com o timer rodando no mesmo processo, via streamlit.testing.
+
+Cada sessão é um AppTest que configura um treino e clica em "Iniciar
+Treino". Um único laço dispara os reruns de todas as sessões na cadência
+que a política de atualização pede (como o run_every do fragmento faria
+no navegador), sempre o mais atrasado primeiro. Quando a soma dos reruns
+passa do tempo disponível, os ticks atrasam: para cada N são medidos o
+tempo por rerun, a taxa de ticks alcançada contra a pedida, o atraso dos
+ticks, CPU e RSS. A curva de capacidade vai para um CSV comparável entre
+versões. Roda totalmente offline.
+
+O AppTest não é seguro entre threads (troca o Runtime global a cada run),
+por isso um só laço; e como cada run espera o script terminar, o modo
+"Servidor" do app, que fica em loop dentro do script, não é medido aqui.
+Reruns completos são um limite superior do custo do modo "Fragmento".
+
+Uso: python benchmarks/load_test.py [--sessions 1,5,10,20,40] [--duration 20]
+     [--output capacidade.csv] [--label v1] [--append]
+"""
+import argparse
+import atexit
+import csv
+import heapq
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Histórico e snapshots de retomada das sessões de carga vão para uma pasta temporária,
+# não para o Data/ do app (o custo de gravar continua na medida)
+SCRATCH_DIR = tempfile.mkdtemp(prefix="timer-carga-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ["TIMER_HISTORY_PATH"] = os.path.join(SCRATCH_DIR, "historico.db")
+os.environ["TIMER_RESUME_DIR"] = os.path.join(SCRATCH_DIR, "retomada")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import refresh_policy  # noqa: E402
+
+APP = os.path.join(ROOT, "Timer.py")
+
+FIELDS = [
+    "versao", "sessoes", "concluidas", "ticks", "ticks_por_s", "ticks_pedidos_por_s",
+    "rerun_medio_ms", "rerun_p95_ms", "tick_app_ms", "atraso_p50_ms", "atraso_p95_ms",
+    "cpu_pct", "rss_mb",
+]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def rss_mb():
+    # RSS atual pelo /proc; fora do Linux, o pico informado pelo getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def start_session(index, duration, tick_interval):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.text_input[0].set_value(f"Carga {index}")
+    at.number_input[0].set_value(1)
+    at.number_input[1].set_value(duration)
+    at.selectbox[0].select("fragmento")
+    at.run()
+    at.session_state.tick_interval = tick_interval
+    next(button for button in at.button if button.label == "Iniciar Treino").click().run()
+    return at
+
+
+def next_interval(at, tick_interval):
+    return refresh_policy.fragment_interval(at.session_state.timer.snapshot(), tick_interval)
+
+
+def ideal_ticks(duration, tick_interval):
+    # Ticks que uma sessão pediria num treino inteiro sem nenhum atraso
+    remaining, ticks = float(duration), 0
+    while remaining > 0:
+        remaining -= refresh_policy.fragment_interval(SimpleNamespace(is_running=True, time_remaining=remaining), tick_interval)
+        ticks += 1
+    return ticks
+
+
+def measure(sessions, duration, tick_interval):
+    apps = [start_session(index, duration, tick_interval) for index in range(sessions)]
+
+    rerun_times = []
+    lateness = []
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+
+    # Heap de (instante devido, sessão): o tick mais atrasado roda primeiro
+    queue = []
+    for index, at in enumerate(apps):
+        interval = next_interval(at, tick_interval)
+        if interval is not None:
+            heapq.heappush(queue, (started + interval, index, interval))
+
+    while queue:
+        due, index, interval = heapq.heappop(queue)
+        now = time.perf_counter()
+        if due > now:
+            time.sleep(due - now)
+            now = time.perf_counter()
+        lateness.append((now - due) * 1000)
+
+        at = apps[index]
+        at.run()
+        finished = time.perf_counter()
+        rerun_times.append((finished - now) * 1000)
+
+        interval = next_interval(at, tick_interval)
+        if interval is not None:
+            # Cadência fixa como o run_every: o próximo tick conta do anterior, não do fim deste
+            heapq.heappush(queue, (max(due + interval, finished), index, interval))
+
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+
+    app_ticks = [at.session_state.tick_stats.get("fragmento") for at in apps]
+    app_ticks = [stats for stats in app_ticks if stats is not None]
+    app_script = sum(stats.script_time for stats in app_ticks)
+    app_count = sum(stats.ticks for stats in app_ticks)
+
+    return {
+        "sessoes": sessions,
+        "concluidas": sum(1 for at in apps if not at.exception and not at.session_state.timer.snapshot().is_running),
+        "ticks": len(rerun_times),
+        "ticks_por_s": round(len(rerun_times) / wall, 2),
+        "ticks_pedidos_por_s": round(sessions * ideal_ticks(duration, tick_interval) / duration, 2),
+        "rerun_medio_ms": round(sum(rerun_times) / len(rerun_times), 3) if rerun_times else 0.0,
+        "rerun_p95_ms": round(percentile(rerun_times, 0.95), 3),
+        "tick_app_ms": round(app_script / app_count * 1000, 3) if app_count else 0.0,
+        "atraso_p50_ms": round(percentile(lateness, 0.50), 3),
+        "atraso_p95_ms": round(percentile(lateness, 0.95), 3),
+        "cpu_pct": round(cpu / wall * 100, 1),
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,5,10,20,40", help="valores de N separados por vírgula")
+    parser.add_argument("--duration", type=int, default=20, help="duração do treino em segundos (mínimo 10)")
+    parser.add_argument("--tick-interval", type=float, default=0.1)
+    parser.add_argument("--output", default="capacidade.csv")
+    parser.add_argument("--label", default="atual", help="identifica a versão medida no CSV")
+    parser.add_argument("--append", action="store_true", help="acrescenta ao CSV para comparar versões")
+    args = parser.parse_args()
+
+    rows = []
+    print(" ".join(f"{field:>14}" for field in FIELDS[1:]))
+    for sessions in (int(value) for value in args.sessions.split(",")):
+        row = {"versao": args.label, **measure(sessions, args.duration, args.tick_interval)}
+        rows.append(row)
+        print(" ".join(f"{row[field]:>14}" for field in FIELDS[1:]), flush=True)
+
+    exists = os.path.exists(args.output)
+    with open(args.output, "a" if args.append else "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if not (args.append and exists):
+            writer.writeheader()
+        writer.writerows(rows)
+    print(f"Curva de capacidade salva em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
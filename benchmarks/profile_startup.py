@@ -0,0 +1,112 @@
+"""Perfil de inicialização do app: tempo até a primeira página e custo fixo de cada rerun.
+
+Cada repetição roda num processo novo (importações frias): mede o primeiro
+run do script, que inclui importar os módulos do app, e depois a mediana
+de reruns sem interação. O script roda sem servidor ("bare"), então os
+números são o custo do próprio app, sem o transporte do Streamlit. Com
+--importtime, lista os módulos mais caros de importar junto com o app.
+
+Uso: python benchmarks/profile_startup.py [--repeat 5] [--reruns 20] [--importtime]
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "Timer.py")
+
+
+def child(reruns):
+    # Executa o script como o Streamlit faz: compilado uma vez e executado a cada rerun,
+    # com o Streamlit já importado pelo servidor antes da primeira sessão
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # Histórico e retomada numa pasta temporária, fora do Data/ do app
+    scratch = tempfile.mkdtemp(prefix="timer-perfil-")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    os.environ["TIMER_HISTORY_PATH"] = os.path.join(scratch, "historico.db")
+    os.environ["TIMER_RESUME_DIR"] = os.path.join(scratch, "retomada")
+    sys.path.insert(0, ROOT)
+    import logging
+
+    import streamlit  # noqa: F401
+
+    # Sem servidor, o Streamlit avisa a cada chamada de st.*; o log distorceria a medida
+    logging.disable(logging.WARNING)
+
+    def run_script(code):
+        exec(code, {"__name__": "__main__", "__file__": APP})
+
+    started = time.perf_counter()
+    with open(APP, encoding="utf-8") as f:
+        code = compile(f.read(), APP, "exec")
+    run_script(code)
+    first = time.perf_counter() - started
+
+    # Reruns medidos em regime, depois do aquecimento do áudio em segundo plano
+    import audio
+    audio.get_engine().warm_up().join()
+
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        run_script(code)
+        times.append(time.perf_counter() - started)
+    print(json.dumps({"primeira_pagina_ms": first * 1000, "rerun_ms": statistics.median(times) * 1000}))
+
+
+def import_profile(top):
+    # -X importtime escreve no stderr: "import time: self | cumulative | módulo"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import Timer"],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "SDL_AUDIODRIVER": "dummy"},
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    print(f"\n{'acumulado_ms':>12}  módulo")
+    for cumulative, module in rows[:top]:
+        print(f"{cumulative / 1000:>12.1f}  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.reruns)
+        return
+
+    results = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--reruns", str(args.reruns)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {
+        key: round(statistics.median(result[key] for result in results), 2)
+        for key in ("primeira_pagina_ms", "rerun_ms")
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if args.importtime:
+        import_profile(15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import io
+import os
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOGO_PATH = os.path.join(BASE_DIR, "assets", "logo.png")
+LOGO_WIDTH = 80
+
+
+@lru_cache(maxsize=None)
+def logo_png():
+    # Lido e reduzido uma vez por processo. O st.image recebe bytes já na largura final:
+    # sem acesso ao disco nem redimensionamento por rerun, e o navegador guarda a imagem
+    # em cache pela URL de mídia em vez de recebê-la embutida a cada rerun
+    from PIL import Image
+
+    try:
+        image = Image.open(LOGO_PATH)
+        image.thumbnail((LOGO_WIDTH, LOGO_WIDTH * 4))
+    except OSError:
+        return None
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
@@ -0,0 +1,26 @@
+import os
+
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "countdown_frontend")
+
+_countdown = components.declare_component("countdown", path=FRONTEND_DIR)
+
+
+def countdown(team_name, session, durations, labels, remaining, anchor, can_control=True, key=None):
+    # O navegador conta localmente a partir de `remaining` e só devolve um valor
+    # ({"event": "boundary" | "stop", "id": n}) nas fronteiras de sessão e ao parar.
+    # `durations`/`labels` descrevem os segmentos do plano; `anchor` muda sempre
+    # que o servidor quer reancorar a contagem. Sem `can_control` (espectador de
+    # uma sala), o botão de parar não aparece.
+    return _countdown(
+        team_name=team_name,
+        session=session,
+        durations=durations,
+        labels=labels,
+        remaining=remaining,
+        anchor=anchor,
+        can_control=can_control,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import threading
+import time
+import weakref
+
+import audio
+from instrumentation import recorder
+
+# Antecedência com que a thread de áudio acorda para um aviso
+LOOKAHEAD = 0.05
+# Trecho final da espera feito em espera ativa, para não depender da granularidade do sleep
+SPIN = 0.002
+# Avisos mais atrasados que isto são descartados em vez de tocados em rajada
+MAX_LATENESS = 0.25
+
+
+class CueScheduler:
+    """Thread de áudio que toca avisos no instante programado do relógio monotônico.
+
+    Os avisos de uma sessão são enfileirados com antecedência; a thread
+    dorme até `LOOKAHEAD` antes do prazo, espera com precisão e entrega o
+    som ao mixer, independente da cadência de atualização da interface.
+    `cancel(owner)` remove todos os avisos pendentes de um timer. Os donos
+    são referenciados fracamente: um timer descartado (sessão do navegador
+    encerrada) some da fila junto com os seus avisos.
+    """
+
+    def __init__(self, play, clock=time.monotonic):
+        self.play = play
+        self.clock = clock
+        self._queue = []
+        self._order = itertools.count()
+        self._pending = weakref.WeakKeyDictionary()  # owner -> ids dos avisos ainda válidos
+        self._cond = threading.Condition()
+        self._thread = None
+        self.dropped = 0
+
+    def schedule(self, owner, cue, at):
+        with self._cond:
+            cue_id = next(self._order)
+            self._pending.setdefault(owner, set()).add(cue_id)
+            heapq.heappush(self._queue, (at, cue_id, weakref.ref(owner), cue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="timer-cues", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, owner):
+        # Os itens ficam no heap e são ignorados quando chegam ao topo
+        with self._cond:
+            self._pending.pop(owner, None)
+
+    def _next_due(self):
+        # Chamado com o lock: descarta cancelados e devolve o próximo aviso válido
+        while self._queue:
+            at, cue_id, owner, cue = self._queue[0]
+            owner = owner()
+            if owner is not None and cue_id in self._pending.get(owner, ()):
+                return self._queue[0]
+            heapq.heappop(self._queue)
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                item = self._next_due()
+                while item is None or item[0] - self.clock() > LOOKAHEAD:
+                    timeout = None if item is None else item[0] - self.clock() - LOOKAHEAD
+                    self._cond.wait(timeout)
+                    item = self._next_due()
+
+            at, cue_id, owner, cue = item
+            remaining = at - self.clock()
+            if remaining > SPIN:
+                time.sleep(remaining - SPIN)
+            while self.clock() < at:
+                pass
+
+            with self._cond:
+                # Pode ter sido cancelado ou superado por um aviso anterior durante a espera
+                if self._next_due() is not item:
+                    continue
+                heapq.heappop(self._queue)
+                owner = owner()
+                pending = self._pending.get(owner) if owner is not None else None
+                if not pending:
+                    continue
+                pending.discard(cue_id)
+                if not pending:
+                    del self._pending[owner]
+                del owner  # A thread de áudio não segura o timer enquanto toca
+
+            now = self.clock()
+            if now - at > MAX_LATENESS:
+                self.dropped += 1
+                continue
+            self.play(cue)
+            recorder.record_dispatch(cue, at, self.clock())
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cue_scheduler():
+    # Thread de avisos do processo, tocando pelo engine de áudio compartilhado
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = CueScheduler(audio.get_engine().play)
+    return _default
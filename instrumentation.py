@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import NamedTuple
+
+# Limites superiores dos buckets de latência, em milissegundos
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    """Histograma de buckets fixos; registrar é um bisect e um incremento."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # O último bucket é +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, p):
+        # Limite superior do bucket que contém o percentil p (0-1)
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class TimingRecord(NamedTuple):
+    kind: str         # "deteccao" (fronteira percebida) ou "disparo" (som entregue ao mixer)
+    label: str        # Sessão que terminou ou nome do aviso
+    scheduled: float  # Instante programado (relógio monotônico)
+    actual: float     # Instante em que aconteceu
+
+
+class TimingRecorder:
+    """Latências de fronteira por processo: atraso de detecção e de disparo do áudio."""
+
+    def __init__(self, recent=1024):
+        self.detection = Histogram()
+        self.dispatch = Histogram()
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def record_detection(self, session, scheduled, detected):
+        with self._lock:
+            self.detection.observe((detected - scheduled) * 1000)
+            self.recent.append(TimingRecord("deteccao", str(session), scheduled, detected))
+
+    def record_dispatch(self, cue, scheduled, dispatched):
+        with self._lock:
+            self.dispatch.observe((dispatched - scheduled) * 1000)
+            self.recent.append(TimingRecord("disparo", cue, scheduled, dispatched))
+
+    def summary(self):
+        return {
+            "deteccao_ms": self.detection.summary(),
+            "disparo_ms": self.dispatch.summary(),
+        }
+
+    def to_json(self):
+        with self._lock:
+            data = {
+                "resumo": self.summary(),
+                "buckets_ms": list(LATENCY_BUCKETS_MS) + ["+Inf"],
+                "deteccao": list(self.detection.counts),
+                "disparo": list(self.dispatch.counts),
+                "recentes": [record._asdict() for record in self.recent],
+            }
+        return json.dumps(data, indent=2)
+
+    def to_csv(self):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["kind", "label", "scheduled", "actual", "late_ms"])
+        with self._lock:
+            records = list(self.recent)
+        for record in records:
+            writer.writerow([
+                record.kind,
+                record.label,
+                f"{record.scheduled:.6f}",
+                f"{record.actual:.6f}",
+                f"{(record.actual - record.scheduled) * 1000:.3f}",
+            ])
+        return output.getvalue()
+
+
+# Registro do processo, compartilhado por todas as salas
+recorder = TimingRecorder()
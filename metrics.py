@@ -0,0 +1,229 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import audio
+import rooms
+from cue_scheduler import default_cue_scheduler
+from instrumentation import LATENCY_BUCKETS_MS, Histogram, recorder
+from scheduler import default_scheduler
+
+# Porta HTTP local do endpoint /metrics (vazio: desligado)
+METRICS_PORT = os.environ.get("TIMER_METRICS_PORT", "")
+METRICS_HOST = os.environ.get("TIMER_METRICS_HOST", "127.0.0.1")
+
+
+class _PerThread:
+    # Cada thread escreve só na sua célula, então registrar não precisa de lock;
+    # a leitura junta as células de todas as threads
+    __slots__ = ("_factory", "_cells")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._cells = {}
+
+    def cell(self):
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            cell = self._cells[ident] = self._factory()
+        return cell
+
+    def cells(self):
+        return list(self._cells.values())
+
+
+class Counter:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _PerThread(lambda: [0])
+
+    def inc(self, amount=1):
+        self._cells.cell()[0] += amount
+
+    def value(self):
+        return sum(cell[0] for cell in self._cells.cells())
+
+
+class LatencyHistogram:
+    # Histograma de buckets fixos em ms, uma instância por thread, somadas na exportação
+    __slots__ = ("bounds", "_cells")
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._cells = _PerThread(lambda: Histogram(self.bounds))
+
+    def observe(self, value_ms):
+        self._cells.cell().observe(value_ms)
+
+    def merged(self):
+        total = Histogram(self.bounds)
+        for cell in self._cells.cells():
+            total.count += cell.count
+            total.sum += cell.sum
+            for index, count in enumerate(cell.counts):
+                total.counts[index] += count
+        return total
+
+
+class MetricsRegistry:
+    """Métricas do processo no formato de texto do Prometheus.
+
+    Contadores e histogramas próprios são registrados sem lock no caminho
+    do tick; o que já é contado em outro lugar (áudio, latência das
+    fronteiras, salas ativas) entra como coleta lida só na exportação.
+    """
+
+    def __init__(self):
+        self._families = {}  # nome -> (tipo, ajuda, {rótulos: métrica ou função})
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, **labels):
+        return self._child(name, "counter", help, labels, Counter)
+
+    def histogram(self, name, help, **labels):
+        # Observações em ms; exportado em segundos, como manda a convenção do Prometheus
+        return self._child(name, "histogram", help, labels, LatencyHistogram)
+
+    def collect(self, name, kind, help, read, **labels):
+        # `read()` devolve o valor (ou um Histogram em ms) no momento da exportação
+        with self._lock:
+            self._families.setdefault(name, (kind, help, {}))[2][_label_key(labels)] = read
+
+    def _child(self, name, kind, help, labels, factory):
+        key = _label_key(labels)
+        family = self._families.get(name)
+        if family is None or key not in family[2]:
+            with self._lock:
+                family = self._families.setdefault(name, (kind, help, {}))
+                family[2].setdefault(key, factory())
+        return family[2][key]
+
+    def exposition(self):
+        lines = []
+        with self._lock:
+            families = [(name, kind, help, dict(children)) for name, (kind, help, children) in self._families.items()]
+        for name, kind, help, children in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, child in children.items():
+                value = child() if callable(child) else child
+                if kind == "histogram":
+                    histogram = value.merged() if isinstance(value, LatencyHistogram) else value
+                    lines.extend(_histogram_lines(name, key, histogram))
+                else:
+                    number = value.value() if isinstance(value, Counter) else value
+                    lines.append(f"{name}{_format_labels(key)} {_format_number(number)}")
+        return "\n".join(lines) + "\n"
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name, key, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{_format_labels(key, [('le', _format_number(bound / 1000))])} {cumulative}"
+    yield f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}"
+    yield f"{name}_sum{_format_labels(key)} {_format_number(histogram.sum / 1000)}"
+    yield f"{name}_count{_format_labels(key)} {histogram.count}"
+
+
+# Registro do processo
+registry = MetricsRegistry()
+
+registry.collect(
+    "timer_active_timers", "gauge", "Timers em andamento no processo (salas e sessões privadas)",
+    lambda: len(rooms.active_rooms()),
+)
+registry.collect(
+    "timer_boundary_lateness_seconds", "histogram", "Atraso da detecção de cada fim de sessão",
+    lambda: recorder.detection,
+)
+registry.collect(
+    "timer_cue_lateness_seconds", "histogram", "Atraso da entrega de cada aviso sonoro ao mixer",
+    lambda: recorder.dispatch,
+)
+registry.collect(
+    "timer_audio_plays_total", "counter", "Avisos sonoros tocados",
+    lambda: audio.get_engine().stats.plays,
+)
+registry.collect(
+    "timer_audio_failures_total", "counter", "Avisos que falharam ao tocar",
+    lambda: audio.get_engine().stats.failures,
+)
+registry.collect(
+    "timer_audio_unavailable_total", "counter", "Avisos não tocados por falta de áudio ou de som carregado",
+    lambda: audio.get_engine().stats.unavailable,
+)
+registry.collect(
+    "timer_cues_dropped_total", "counter", "Avisos descartados por chegarem atrasados demais",
+    lambda: default_cue_scheduler().dropped,
+)
+registry.collect(
+    "timer_scheduler_errors_total", "counter", "Callbacks do scheduler que levantaram exceção",
+    lambda: default_scheduler().errors,
+)
+for _cue in audio.get_engine().load_times():
+    registry.collect(
+        "timer_sound_load_seconds", "gauge", "Tempo da última decodificação/síntese de cada aviso",
+        lambda cue=_cue: audio.get_engine().load_times()[cue],
+        aviso=_cue,
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sem log por scrape
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+# Falha ao abrir a porta (ex.: já em uso): registrada uma vez, sem nova tentativa a cada rerun
+server_error = None
+
+
+def start_server(port=METRICS_PORT, host=METRICS_HOST):
+    # Endpoint /metrics numa thread do processo, iniciado uma única vez
+    global _server, server_error
+    if not port or _server is not None or server_error is not None:
+        return _server
+    with _server_lock:
+        if _server is None and server_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _Handler)
+            except (OSError, ValueError) as e:
+                server_error = f"{host}:{port}: {e}"
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="timer-metrics", daemon=True).start()
+    return _server
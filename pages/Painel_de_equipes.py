@@ -0,0 +1,52 @@
+import streamlit as st
+
+import metrics
+import refresh_policy
+import render
+import rooms
+
+# O painel mostra minutos:segundos, então uma atualização por segundo basta
+REFRESH_INTERVAL = refresh_policy.SLOW_INTERVAL
+
+
+def board_rows():
+    # Uma linha por timer em andamento, a partir da leitura das salas compartilhada entre painéis
+    return [
+        {
+            "equipe": team,
+            "sessão": f"{timer.current_session}/{timer.total_sessions}",
+            "etapa": timer.label,
+            "restante": render.format_clock(timer.time_remaining),
+            "total restante": render.format_clock(timer.remaining_total),
+            "progresso": timer.progress,
+        }
+        for team, timer in rooms.board(max_age=REFRESH_INTERVAL / 2)
+    ]
+
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def live_board():
+    metrics.registry.counter("timer_reruns_total", "Execuções do script", tipo="painel").inc()
+    rows = board_rows()
+    st.caption(f"{len(rows)} treino(s) em andamento")
+    if not rows:
+        st.info("Nenhum treino em andamento")
+        return
+    # Um único elemento para todas as equipes: o custo do rerun não depende de quantas são
+    st.dataframe(
+        rows,
+        hide_index=True,
+        width="stretch",
+        height=min(38 + 35 * len(rows), 1200),
+        column_config={
+            "progresso": st.column_config.ProgressColumn("progresso", format="%d%%", min_value=0, max_value=100),
+        },
+    )
+
+
+def main():
+    st.set_page_config(page_title="Painel de equipes", page_icon="⏱️", layout="wide")
+    st.title("Painel de equipes")
+    live_board()
+
+main()
@@ -0,0 +1,52 @@
+class TickStats:
+    """Acumula o custo de cada tick do timer em andamento (tempo de script e HTML enviado)."""
+
+    __slots__ = ("ticks", "script_time", "max_script_time", "html_bytes")
+
+    def __init__(self):
+        self.ticks = 0
+        self.script_time = 0.0
+        self.max_script_time = 0.0
+        self.html_bytes = 0
+
+    def record(self, elapsed, html_bytes):
+        self.ticks += 1
+        self.script_time += elapsed
+        self.html_bytes += html_bytes
+        if elapsed > self.max_script_time:
+            self.max_script_time = elapsed
+
+    def summary(self):
+        if not self.ticks:
+            return {"ticks": 0, "media_ms": 0.0, "max_ms": 0.0, "bytes_por_tick": 0}
+        return {
+            "ticks": self.ticks,
+            "media_ms": round(self.script_time / self.ticks * 1000, 3),
+            "max_ms": round(self.max_script_time * 1000, 3),
+            "bytes_por_tick": self.html_bytes // self.ticks,
+        }
+
+
+class RerunSavings:
+    """Reruns evitados pela atualização adaptativa num treino, comparados à cadência fixa."""
+
+    __slots__ = ("fixed_interval", "started", "last", "reruns")
+
+    def __init__(self, fixed_interval, started):
+        self.fixed_interval = fixed_interval
+        self.started = started
+        self.last = started
+        self.reruns = 0
+
+    def record(self, now):
+        self.reruns += 1
+        self.last = now
+
+    def summary(self):
+        # Quantos ticks a cadência fixa teria feito no mesmo tempo de treino
+        fixed = int((self.last - self.started) / self.fixed_interval)
+        return {
+            "reruns": self.reruns,
+            "cadencia_fixa": fixed,
+            "evitados": max(fixed - self.reruns, 0),
+        }
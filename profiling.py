@@ -0,0 +1,130 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Intervalo entre amostras das pilhas enquanto algum rerun está sendo perfilado (segundos)
+PROFILE_INTERVAL = float(os.environ.get("TIMER_PROFILE_INTERVAL", "0.002"))
+# Arquivo onde o perfil agregado é gravado ao encerrar o processo (vazio: não grava)
+PROFILE_OUTPUT = os.environ.get("TIMER_PROFILE_OUTPUT", "")
+
+
+class StackSampler:
+    """Perfil por amostragem das threads que estão executando um rerun.
+
+    Uma thread lê as pilhas com `sys._current_frames()` a cada `interval`,
+    só enquanto alguma thread está dentro de `profile()`, e soma as pilhas
+    no formato "collapsed" (quadro;quadro;... contagem), pronto para
+    flamegraph.pl ou speedscope. As contagens se acumulam entre reruns.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.runs = 0
+        self._active = {}  # thread -> profundidade de profile() aninhados
+        self._labels = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    @contextmanager
+    def profile(self):
+        ident = threading.get_ident()
+        with self._cond:
+            depth = self._active.get(ident, 0)
+            self._active[ident] = depth + 1
+            if not depth:
+                self.runs += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="timer-profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        try:
+            yield self
+        finally:
+            with self._cond:
+                if depth:
+                    self._active[ident] = depth
+                else:
+                    self._active.pop(ident, None)
+
+    @contextmanager
+    def paused(self):
+        # Esperas entre ticks ficam fora do perfil, que mede só o trabalho
+        ident = threading.get_ident()
+        with self._cond:
+            depth = self._active.pop(ident, 0)
+        try:
+            yield
+        finally:
+            if depth:
+                with self._cond:
+                    self._active[ident] = depth
+
+    def collapsed(self):
+        with self._cond:
+            items = sorted(self.stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def top(self, n=10):
+        # Funções onde as amostras caíram (tempo próprio), em % do total
+        leaves = Counter()
+        with self._cond:
+            for stack, count in self.stacks.items():
+                leaves[stack.rpartition(";")[2]] += count
+            total = self.samples or 1
+        return {label: round(count / total * 100, 1) for label, count in leaves.most_common(n)}
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+                idents = list(self._active)
+            frames = sys._current_frames()
+            stacks = [self._collapse(frames[ident]) for ident in idents if ident in frames]
+            del frames
+            with self._cond:
+                for stack in stacks:
+                    self.stacks[stack] += 1
+                self.samples += len(stacks)
+            time.sleep(self.interval)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def sampler():
+    # Amostrador do processo: o perfil agrega os reruns de todas as sessões perfiladas
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = StackSampler()
+                if PROFILE_OUTPUT:
+                    atexit.register(_sampler.write, PROFILE_OUTPUT)
+    return _sampler
@@ -0,0 +1,30 @@
+# Janela final da sessão com atualização rápida (a mesma em que o display fica vermelho)
+FAST_WINDOW = 5.0
+# Intervalo máximo entre atualizações fora da janela final: o MM:SS só muda uma vez por segundo
+SLOW_INTERVAL = 1.0
+# Folga para o tick cair logo depois da troca do segundo, e não um pouco antes
+ALIGN_SLACK = 0.02
+
+
+def next_interval(timer, fast_interval, slow_interval=SLOW_INTERVAL):
+    """Tempo até a próxima atualização útil do timer em andamento, ou None se parado.
+
+    O cálculo parte do tempo até a próxima fronteira (`time_remaining`):
+    na janela final usa a cadência rápida; antes dela, espera a próxima
+    troca do segundo exibido, sem passar do início da janela final.
+    """
+    if not timer.is_running:
+        return None
+    remaining = timer.time_remaining
+    if remaining <= FAST_WINDOW:
+        return fast_interval
+    # O display mostra int(remaining), que muda quando remaining cruza o inteiro abaixo
+    until_change = remaining % 1.0 + ALIGN_SLACK
+    return min(until_change, slow_interval, remaining - FAST_WINDOW + ALIGN_SLACK)
+
+
+def fragment_interval(timer, fast_interval, slow_interval=SLOW_INTERVAL):
+    # O run_every do fragmento só muda num rerun completo, então a cadência é por faixa
+    if not timer.is_running:
+        return None
+    return fast_interval if timer.time_remaining <= FAST_WINDOW else slow_interval
@@ -0,0 +1,135 @@
+# Templates do painel do timer em andamento, formatados só quando as entradas mudam
+
+TITLE = """
+<div style="text-align: center; margin-bottom: 10px;">
+    <h1 style="color: #0e1117; font-size: 36px;">{team_name}</h1>
+</div>
+"""
+
+CARD = """
+<div style="text-align: center; background-color: {bg_color}; padding: 30px;
+     border-radius: 15px; margin: 20px 0; border: 2px solid {border_color}; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+    <h1 style="font-size: 120px; font-weight: bold; margin: 0; color: {timer_color};">{time_str}</h1>
+    <h3 style="color: #555; margin-top: 10px;">Sessão {session} de {total} · {label}</h3>
+</div>
+"""
+
+STATS = """
+<div style="display: flex; justify-content: space-between; background-color: #f8f9fa;
+     padding: 15px; border-radius: 10px; margin: 15px 0; text-align: center;">
+    <div style="flex: 1;">
+        <p style="font-weight: bold; margin: 0; color: #555;">Sessão</p>
+        <p style="font-size: 24px; margin: 0;">{session}/{total}</p>
+    </div>
+    <div style="flex: 1; border-left: 1px solid #ddd; border-right: 1px solid #ddd; padding: 0 10px;">
+        <p style="font-weight: bold; margin: 0; color: #555;">Tempo Total</p>
+        <p style="font-size: 24px; margin: 0;">{total_str}</p>
+    </div>
+    <div style="flex: 1;">
+        <p style="font-weight: bold; margin: 0; color: #555;">Progresso</p>
+        <p style="font-size: 24px; margin: 0;">{progress}%</p>
+    </div>
+</div>
+"""
+
+PROGRESS_BAR = """
+<div style="background-color: #e0e0e0; border-radius: 10px; height: 10px; margin: 10px 0;">
+    <div style="background-color: #4CAF50; width: {progress}%; height: 10px; border-radius: 10px;"></div>
+</div>
+"""
+
+STOP_BUTTON = """
+<div style="text-align: center; margin-top: 20px;">
+    <div style="background-color: #f44336; color: white; border: none;
+            padding: 12px 30px; text-align: center; display: inline-block;
+            font-size: 18px; margin: 4px 2px; border-radius: 8px;">
+        PARAR TREINO
+    </div>
+</div>
+"""
+
+# Botão real do Streamlit, invisível mas clicável sobre o botão visual
+STOP_STYLE = """
+<style>
+div[data-testid="stButton"] > button {
+    opacity: 0;
+    position: relative;
+    top: -60px;
+    height: 50px;
+    cursor: pointer;
+}
+</style>
+"""
+
+# Blocos do painel, na ordem em que aparecem na página
+BLOCKS = {
+    "titulo": TITLE,
+    "cartao": CARD,
+    "resumo": STATS,
+    "barra": PROGRESS_BAR,
+    "botao": STOP_BUTTON,
+}
+
+# Cores do cartão: (texto, fundo, borda)
+NORMAL_COLORS = ("#0e1117", "#f0f2f6", "#e0e0e0")
+WARNING_COLORS = ("#FF0000", "#fff0f0", "#ffcccc")  # Faltam menos de 5 segundos
+
+
+def format_clock(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def panel_values(team_name, timer, can_control=True):
+    # Entradas de cada bloco; um bloco só é refeito quando as suas mudam.
+    # Espectadores não têm o botão real por trás, então o visual fica de fora
+    timer_color, bg_color, border_color = WARNING_COLORS if timer.time_remaining < 5 else NORMAL_COLORS
+    values = {
+        "titulo": {"team_name": team_name},
+        "cartao": {
+            "time_str": format_clock(timer.time_remaining),
+            "timer_color": timer_color,
+            "bg_color": bg_color,
+            "border_color": border_color,
+            "session": timer.current_session,
+            "total": timer.total_sessions,
+            "label": timer.label,
+        },
+        "resumo": {
+            "session": timer.current_session,
+            "total": timer.total_sessions,
+            "total_str": format_clock(timer.remaining_total),
+            "progress": timer.progress,
+        },
+        "barra": {"progress": timer.progress},
+    }
+    if can_control:
+        values["botao"] = {}
+    return values
+
+
+class PanelRenderer:
+    """Últimos valores desenhados de cada bloco do painel, por sessão do navegador.
+
+    `html()` devolve o HTML do bloco e se ele mudou desde o último desenho;
+    o template só é formatado de novo quando as entradas mudam.
+    """
+
+    __slots__ = ("_values", "_html")
+
+    def __init__(self):
+        self._values = {}
+        self._html = {}
+
+    def html(self, block, values):
+        if self._values.get(block) == values:
+            return self._html[block], False
+        html = BLOCKS[block].format_map(values)
+        self._values[block] = values
+        self._html[block] = html
+        return html, True
+
+    def reset(self):
+        # Elementos novos na página: o próximo desenho reenvia todos os blocos
+        self._values.clear()
+        self._html.clear()
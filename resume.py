@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+import weakref
+
+# Pasta dos snapshots de treinos em andamento (vazio: retomada desligada)
+RESUME_DIR = os.environ.get(
+    "TIMER_RESUME_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "retomada"),
+)
+
+
+class ResumeStore:
+    """Snapshots mínimos dos treinos em andamento, um arquivo JSON por token.
+
+    Gravado só nas transições (início e fim do treino), nunca por tick: o
+    cronograma é fixo a partir do início, então configuração do plano e
+    instante de início em relógio de parede bastam para reconstruir a
+    sessão atual e o tempo restante depois de um reinício do servidor.
+    A gravação é atômica (arquivo temporário, fsync e rename). Enquanto o
+    processo vive, cada token também aponta (fracamente) para a sala que
+    roda o treino, para que recarregar a página reanexe em vez de duplicar.
+    """
+
+    def __init__(self, directory=RESUME_DIR):
+        self.directory = directory
+        self._rooms = weakref.WeakValueDictionary()  # token -> sala viva neste processo
+        os.makedirs(directory, exist_ok=True)
+
+    def track(self, token, room):
+        self._rooms[token] = room
+
+    def live_room(self, token):
+        # Sala deste processo ainda rodando o treino do token, ou None se o processo reiniciou
+        room = self._rooms.get(token)
+        if room is not None and room.snapshot().is_running:
+            return room
+        return None
+
+    def _path(self, token):
+        # O token vem da URL: só nomes hexadecimais viram caminho
+        if not token or len(token) > 64 or not all(c in "0123456789abcdef" for c in token):
+            return None
+        return os.path.join(self.directory, f"{token}.json")
+
+    def save(self, token, snapshot):
+        path = self._path(token)
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+
+    def load(self, token):
+        # Snapshot do token, ou None se não existe, está corrompido ou o treino já teria terminado
+        path = self._path(token)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if snapshot.get("fim", 0) <= time.time():
+            self.discard(token)
+            return None
+        return snapshot
+
+    def discard(self, token):
+        self._rooms.pop(token, None)
+        path = self._path(token)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def prune(self):
+        # Remove snapshots de treinos que já terminaram (abas fechadas antes do fim)
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    expired = json.load(f).get("fim", 0) <= now
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+_default = None
+_default_lock = threading.Lock()
+# Falha ao preparar a pasta: registrada uma vez, sem nova tentativa a cada rerun
+open_error = None
+
+
+def default_store():
+    # Store do processo, criado sob demanda; None se desligado ou se a pasta não é gravável
+    global _default, open_error
+    if _default is None and RESUME_DIR and open_error is None:
+        with _default_lock:
+            if _default is None and open_error is None:
+                try:
+                    store = ResumeStore()
+                    store.prune()
+                except OSError as e:
+                    open_error = f"{RESUME_DIR}: {e}"
+                    return None
+                _default = store
+    return _default
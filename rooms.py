@@ -0,0 +1,275 @@
+import threading
+import time
+import weakref
+
+from cue_scheduler import default_cue_scheduler
+from instrumentation import recorder
+from scheduler import default_scheduler
+from timer_engine import TimerEngine, SessionEnded, WorkoutCompleted
+from workout_history import default_history
+
+# Intervalo mínimo entre dois avanços do timer de uma sala: dentro dele todos
+# os espectadores recebem o mesmo snapshot já calculado
+SNAPSHOT_QUANTUM = 0.05
+
+# Salas compartilhadas paradas há mais que isto saem do registro (segundos)
+ROOM_IDLE_TTL = 600.0
+
+# Segundos antes do fim de cada sessão em que toca o tique de contagem regressiva
+COUNTDOWN_WARNINGS = (3, 2, 1)
+
+
+class ControlError(Exception):
+    pass
+
+
+class Room:
+    """Dono de um timer em andamento, compartilhado por todas as telas que o acompanham.
+
+    Um único engine por sala; os espectadores só leem snapshots imutáveis,
+    então o custo do timer por tick não cresce com o número de telas.
+    Iniciar e parar é restrito à sessão controladora. Com um `scheduler`,
+    as fronteiras de sessão disparam no prazo pela thread do scheduler, sem
+    depender de alguma tela estar fazendo polling; com `cues`, os avisos
+    sonoros da sessão são enfileirados na thread de áudio com antecedência;
+    com `history`, início, fim de cada sessão e conclusão ou parada vão
+    para o histórico de treinos.
+    """
+
+    def __init__(self, name, on_event=None, clock=time.monotonic, scheduler=None, cues=None, history=None):
+        self.name = name
+        self.team = name  # Nome exibido no painel; salas privadas recebem o do treino ao iniciar
+        self.engine = TimerEngine(clock=clock)
+        self.scheduler = scheduler
+        self.cues = cues
+        self.history = history
+        self._run = None  # Chave do treino em andamento no histórico
+        self._abandon = None
+        self.controller = None
+        self.generation = 0
+        self.completions = 0
+        self.skipped = 0
+        self.on_event = on_event
+        self._lock = threading.Lock()
+        self._deadline = None
+        self._deadline_callback = _weak_method(self._on_deadline)
+        self._snapshot = self.engine.snapshot()
+        self._valid_until = float("inf")
+        self.idle_since = clock()  # Instante em que o timer parou; None enquanto roda
+        _live_rooms.add(self)
+
+    def snapshot(self):
+        now = self.engine.clock()
+        if now < self._valid_until:
+            return self._snapshot
+        with self._lock:
+            if now >= self._valid_until:
+                self._advance(now)
+            return self._snapshot
+
+    def can_control(self, client_id):
+        return self.controller in (None, client_id) or not self.engine.state.is_running
+
+    def start(self, client_id, plan, team=None):
+        with self._lock:
+            if not self.can_control(client_id):
+                raise ControlError(f"O treino '{self.name}' já é controlado por outra tela")
+            self.controller = client_id
+            self.generation += 1
+            # Reiniciar antes do fim conta como parada do treino anterior
+            self._end_run(self.engine.clock(), completed=False)
+            self.team = team or self.name
+            self.engine.configure(plan)
+            self.engine.start()
+            if self.history is not None:
+                self._run = self.history.start(self.team, plan, self.engine.state.start_time, time.time())
+                # Sala descartada no meio do treino (sessão encerrada): registrar como parado
+                self._abandon = weakref.finalize(self, _abandoned, self.history, self._run, self.engine.clock)
+            self._publish(self.engine.clock())
+            self._arm()
+
+    def restore(self, client_id, plan, started_at, team=None):
+        # Treino retomado de um snapshot; uma sala que já está rodando só é acompanhada
+        with self._lock:
+            if self.engine.state.is_running:
+                return True
+            self.controller = client_id
+            self.team = team or self.name
+            self.generation += 1
+            self.engine.configure(plan)
+            restored = self.engine.restore(started_at)
+            self._publish(self.engine.clock())
+            self._arm()
+            return restored
+
+    def stop(self, client_id):
+        with self._lock:
+            if not self.can_control(client_id):
+                raise ControlError(f"Somente a tela que iniciou o treino '{self.name}' pode pará-lo")
+            self._end_run(self.engine.clock(), completed=False)
+            self.engine.stop()
+            self._publish(self.engine.clock())
+            self._arm()
+
+    def _advance(self, now):
+        events = self.engine.advance(now)
+        for event in events:
+            if isinstance(event, WorkoutCompleted):
+                self.completions += 1
+            if self.on_event is not None:
+                self.on_event(event)
+            if isinstance(event, SessionEnded):
+                self.skipped += event.skipped
+                recorder.record_detection(event.session, event.at, now)
+                if self._run is not None:
+                    self.history.session_ended(self._run, event.session, event.skipped, now)
+            elif isinstance(event, WorkoutCompleted):
+                self._end_run(now, completed=True)
+        self._publish(now)
+        if events:
+            # Sem cancelar os avisos: o da fronteira que acabou de passar pode ainda estar na fila
+            self._arm(cancel_cues=False)
+
+    def _end_run(self, now, completed):
+        if self._run is not None:
+            self._abandon.detach()
+            self.history.finish(self._run, now, completed)
+            self._run = None
+
+    def _arm(self, cancel_cues=True):
+        # Agendar a próxima fronteira e os avisos da sessão atual. Iniciar, retomar e parar
+        # cancelam os avisos pendentes; num avanço natural só os da nova sessão são somados
+        if self.cues is not None and cancel_cues:
+            self.cues.cancel(self)
+        self._arm_deadline()
+
+        state = self.engine.state
+        if state.is_running and self.cues is not None:
+            now = self.engine.clock()
+            session_start = state.start_time + state.plan.segment_start(state.current_session - 1)
+            for seconds in COUNTDOWN_WARNINGS:
+                at = state.end_time - seconds
+                if at > now and at > session_start:
+                    self.cues.schedule(self, "countdown", at)
+            last = state.current_session == state.total_sessions
+            self.cues.schedule(self, "workout_end" if last else "beep", state.end_time)
+
+    def _arm_deadline(self):
+        if self.scheduler is None:
+            return
+        if self._deadline is not None:
+            self.scheduler.cancel(self._deadline)
+            self._deadline = None
+        state = self.engine.state
+        if state.is_running:
+            self._deadline = self.scheduler.schedule(state.end_time, self._deadline_callback)
+
+    def _on_deadline(self, handle):
+        # Executado na thread do scheduler
+        with self._lock:
+            if handle is not self._deadline:
+                return
+            self._deadline = None
+            self._advance(self.engine.clock())
+            if self._deadline is None:
+                # Disparo adiantado por arredondamento: reagendar a mesma fronteira (os avisos já estão na fila)
+                self._arm_deadline()
+
+    def _publish(self, now):
+        self._snapshot = self.engine.snapshot()
+        self._valid_until = now + SNAPSHOT_QUANTUM if self._snapshot.is_running else float("inf")
+        if self._snapshot.is_running:
+            self.idle_since = None
+        elif self.idle_since is None:
+            self.idle_since = now
+
+
+def _weak_method(method):
+    # O scheduler não mantém a sala viva: uma sala privada some com a sessão do navegador
+    # que a criou, mesmo com treino em andamento, e o disparo pendente vira no-op
+    ref = weakref.WeakMethod(method)
+
+    def callback(handle):
+        method = ref()
+        if method is not None:
+            method(handle)
+
+    return callback
+
+
+def _abandoned(history, key, clock):
+    history.finish(key, clock(), False)
+
+
+# Todas as salas vivas do processo, inclusive as privadas de cada sessão do navegador
+_live_rooms = weakref.WeakSet()
+
+
+def active_rooms():
+    # Salas com timer em andamento; as privadas somem junto com a sessão que as criou
+    return [room for room in list(_live_rooms) if room.snapshot().is_running]
+
+
+# Leitura de todas as salas compartilhada entre os painéis abertos: (válida até, linhas)
+_board = (0.0, ())
+_board_lock = threading.Lock()
+
+
+def board(clock=time.monotonic, max_age=SNAPSHOT_QUANTUM):
+    # (equipe, snapshot) de cada timer em andamento, ordenado por equipe; uma única
+    # varredura das salas por `max_age`, qualquer que seja o número de painéis
+    global _board
+    now = clock()
+    if now < _board[0]:
+        return _board[1]
+    with _board_lock:
+        if now >= _board[0]:
+            rows = []
+            for room in list(_live_rooms):
+                snapshot = room.snapshot()
+                if snapshot.is_running:
+                    rows.append((room.team or "", snapshot))
+            rows.sort(key=lambda row: row[0].casefold())
+            _board = (now + max_age, tuple(rows))
+        return _board[1]
+
+
+class RoomRegistry:
+    def __init__(self):
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def find(self, name):
+        # Sala já registrada, sem criar: consultas a cada rerun não registram nomes digitados
+        return self._rooms.get(name)
+
+    def get(self, name, on_event=None):
+        # Cria a sala ao iniciar ou retomar um treino, aproveitando para remover as ociosas
+        room = self._rooms.get(name)
+        if room is None:
+            with self._lock:
+                self._evict()
+                room = self._rooms.get(name)
+                if room is None:
+                    room = self._rooms[name] = Room(
+                        name,
+                        on_event,
+                        scheduler=default_scheduler(),
+                        cues=default_cue_scheduler(),
+                        history=default_history(),
+                    )
+        return room
+
+    def rooms(self):
+        return list(self._rooms.values())
+
+    def _evict(self):
+        # Chamado com o lock; quem ainda tem a sala em mãos continua usando o objeto
+        for name, room in list(self._rooms.items()):
+            idle_since = room.idle_since
+            if idle_since is not None and room.engine.clock() - idle_since > ROOM_IDLE_TTL:
+                del self._rooms[name]
+
+
+# Registro de salas do processo, compartilhado por todas as sessões do Streamlit
+registry = RoomRegistry()
@@ -0,0 +1,197 @@
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "callback", "tick", "bucket")
+
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.tick = 0
+        self.bucket = None
+
+    @property
+    def active(self):
+        return self.bucket is not None
+
+
+class TimingWheel:
+    """Timing wheel hierárquico (estilo kernel) com resolução fixa.
+
+    Cada nível tem `slots` posições; o nível L cobre `slots ** (L + 1)` ticks.
+    Inserir e cancelar são O(1); `advance()` processa tick a tick e, quando
+    um nível dá a volta, redistribui o slot correspondente do nível acima.
+    """
+
+    def __init__(self, resolution=0.01, slots=256, levels=4, start=0.0):
+        if slots & (slots - 1):
+            raise ValueError("slots deve ser potência de 2")
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._overflow = set()
+        self._due = set()
+        self.current_tick = int(start / resolution)
+        self.count = 0
+
+    def insert(self, handle):
+        handle.tick = math.ceil(handle.deadline / self.resolution)
+        if handle.tick <= self.current_tick:
+            # Prazo já vencido: sai no próximo advance()
+            self._due.add(handle)
+            handle.bucket = self._due
+        else:
+            self._place(handle)
+        self.count += 1
+        return handle
+
+    def cancel(self, handle):
+        if handle.bucket is not None:
+            handle.bucket.discard(handle)
+            handle.bucket = None
+            self.count -= 1
+
+    def next_tick_time(self):
+        return (self.current_tick + 1) * self.resolution
+
+    def advance(self, now):
+        # Devolve os handles vencidos até `now`, em ordem de tick
+        target = int(now / self.resolution)
+        expired = []
+        if self._due:
+            self._expire(self._due, expired)
+        mask, bits = self._mask, self._bits
+        wheel0 = self._wheels[0]
+        while self.current_tick < target:
+            self.current_tick += 1
+            tick = self.current_tick
+            if not tick & mask:
+                self._cascade(tick)
+            bucket = wheel0[tick & mask]
+            if bucket:
+                self._expire(bucket, expired)
+        return expired
+
+    def _place(self, handle):
+        # Na redistribuição, delta 0 cai no slot do tick atual, processado em seguida
+        delta = handle.tick - self.current_tick
+        bucket = self._overflow
+        bits = self._bits
+        for level in range(self.levels):
+            if delta < 1 << (bits * (level + 1)):
+                bucket = self._wheels[level][(handle.tick >> (bits * level)) & self._mask]
+                break
+        bucket.add(handle)
+        handle.bucket = bucket
+
+    def _cascade(self, tick):
+        bits = self._bits
+        for level in range(1, self.levels):
+            index = (tick >> (bits * level)) & self._mask
+            bucket = self._wheels[level][index]
+            if bucket:
+                handles = list(bucket)
+                bucket.clear()
+                for handle in handles:
+                    self._place(handle)
+            if index:
+                return
+        # Todos os níveis deram a volta: reavaliar o que estava fora do alcance
+        if self._overflow:
+            handles = list(self._overflow)
+            self._overflow.clear()
+            for handle in handles:
+                self._place(handle)
+
+    def _expire(self, bucket, expired):
+        for handle in bucket:
+            handle.bucket = None
+        self.count -= len(bucket)
+        expired.extend(bucket)
+        bucket.clear()
+
+
+class Scheduler:
+    """Dispara callbacks em prazos do relógio monotônico a partir de uma thread.
+
+    Um único scheduler atende todos os timers do processo; a thread dorme
+    enquanto não há prazos e acorda uma vez por tick da roda quando há.
+    O atraso de disparo é limitado pela resolução.
+    """
+
+    def __init__(self, resolution=0.01, clock=time.monotonic):
+        self.clock = clock
+        self.wheel = TimingWheel(resolution, start=clock())
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.errors = 0  # Callbacks que levantaram exceção
+        self.last_error = None
+
+    def schedule(self, deadline, callback):
+        handle = TimerHandle(deadline, callback)
+        with self._cond:
+            if not self.wheel.count:
+                # Roda vazia: pular os ticks ociosos em vez de processá-los um a um
+                wheel = self.wheel
+                wheel.current_tick = max(wheel.current_tick, int(self.clock() / wheel.resolution))
+            self.wheel.insert(handle)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="timer-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._cond:
+            self.wheel.cancel(handle)
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self.wheel.count and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                delay = self.wheel.next_tick_time() - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                expired = self.wheel.advance(self.clock())
+            for handle in expired:
+                try:
+                    handle.callback(handle)
+                except Exception as e:
+                    # Um callback com erro não pode derrubar os demais timers, mas fica registrado
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    logger.exception("Erro no callback do scheduler")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    # Scheduler do processo, criado sob demanda
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Scheduler()
+    return _default
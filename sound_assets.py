@@ -0,0 +1,111 @@
+import hashlib
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivos de beep empacotados com o app, em ordem de preferência, com o SHA-256 esperado
+BEEP_CANDIDATES = (
+    (os.path.join(BASE_DIR, "assets", "beep_sound.mp3"),
+     "688f5e3dcdeed54ccd3f430e1ccd19cd6bf517f193e3711b26c5aedfc7984d94"),
+    (os.path.join(BASE_DIR, "Data", "Áudios", "beep-09.wav"),
+     "b6870d8bb177d056067b1d40349679fc8edeb2e2414edb9a69469e2da516cd42"),
+    (os.path.join(BASE_DIR, "Data", "Áudios", "beep-08b.wav"),
+     "9b511b407fbe2b6e21e0f0c6243221ef2a7bb9f61f62b5bda5d9bf386844ff11"),
+)
+
+# Permite trocar o beep por um arquivo local próprio (sem verificação de checksum)
+BEEP_PATH_ENV = "TIMER_BEEP_PATH"
+
+
+def _file_key(path):
+    # Identifica a versão do arquivo sem ler o conteúdo
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SoundCache:
+    """Cache de processo para um som decodificado.
+
+    O arquivo é resolvido e decodificado uma única vez; `get()` nunca toca
+    o disco. `revalidate()` compara mtime/tamanho e recarrega só se o
+    arquivo mudou, e deve ser chamado fora do caminho de cada tick.
+    """
+
+    def __init__(self, candidates, loader):
+        self._candidates = candidates
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._path = None
+        self._key = None
+        self._sound = None
+        self.error = None
+        self.load_time = 0.0
+
+    @property
+    def path(self):
+        return self._path
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+        return self._sound
+
+    def revalidate(self):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                return self._sound
+            try:
+                key = _file_key(self._path) if self._path else None
+            except OSError:
+                key = None
+            if key is None or key != self._key:
+                self._load()
+            return self._sound
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            self._load_first_candidate()
+        finally:
+            self.load_time = time.perf_counter() - started
+
+    def _load_first_candidate(self):
+        self._loaded = True
+        self._path = self._key = self._sound = None
+        self.error = None
+        for path, checksum in self._candidates():
+            try:
+                key = _file_key(path)
+                if checksum and _sha256(path) != checksum:
+                    self.error = f"Checksum inválido para {os.path.basename(path)}"
+                    continue
+                sound = self._loader(path)
+            except Exception as e:
+                self.error = f"Erro ao carregar {os.path.basename(path)}: {e}"
+                continue
+            self._path, self._key, self._sound = path, key, sound
+            self.error = None
+            return
+        if self.error is None:
+            self.error = "Nenhum arquivo de som encontrado"
+
+
+def beep_candidates():
+    override = os.environ.get(BEEP_PATH_ENV)
+    if override:
+        yield override, None
+    yield from BEEP_CANDIDATES
@@ -0,0 +1,155 @@
+import time
+from typing import NamedTuple
+
+from workout_plan import simple_plan
+
+
+class SessionEnded(NamedTuple):
+    session: int     # Sessão que terminou (1-based)
+    at: float        # Instante programado do fim, no relógio do engine
+    skipped: int = 0  # Fronteiras anteriores perdidas num atraso e agrupadas neste evento
+
+
+class WorkoutCompleted(NamedTuple):
+    at: float
+
+
+class TimerSnapshot(NamedTuple):
+    # Visão imutável do timer para renderização, compartilhável entre sessões
+    is_running: bool
+    current_session: int
+    total_sessions: int
+    label: str
+    time_remaining: float
+    remaining_total: float
+    progress: int
+    plan: object
+
+
+class TimerState:
+    __slots__ = (
+        "plan",
+        "current_session",
+        "is_running",
+        "start_time",
+        "end_time",
+        "time_remaining",
+    )
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.current_session = 0
+        self.is_running = False
+        self.start_time = None
+        self.end_time = None
+        self.time_remaining = 0
+
+    @property
+    def total_sessions(self):
+        return len(self.plan)
+
+
+class TimerEngine:
+    """Timer de sessões sem dependência do Streamlit.
+
+    O relógio é injetável e por padrão é `time.monotonic`, imune a ajustes
+    do relógio de parede. O cronograma é fixo a partir do início: a sessão
+    atual e o tempo restante saem direto do tempo decorrido (bisect no plano
+    compilado), então o atraso de um tick não se acumula e uma pausa longa
+    se resolve em um único `advance()`, com as fronteiras perdidas agrupadas
+    em um só evento.
+    """
+
+    __slots__ = ("state", "clock")
+
+    def __init__(self, plan=None, clock=time.monotonic):
+        self.state = TimerState(plan if plan is not None else simple_plan(4, 30))
+        self.clock = clock
+
+    def configure(self, plan):
+        self.state.plan = plan
+
+    def start(self, now=None):
+        if now is None:
+            now = self.clock()
+        state = self.state
+        first = state.plan.offsets[0]
+        state.current_session = 1
+        state.is_running = True
+        state.start_time = now
+        state.end_time = now + first
+        state.time_remaining = first
+
+    def restore(self, start_time, now=None):
+        # Retoma um treino iniciado em `start_time` direto na sessão em andamento, sem
+        # eventos das fronteiras já passadas; False se o treino já teria terminado
+        if now is None:
+            now = self.clock()
+        state = self.state
+        plan = state.plan
+        index = plan.locate(now - start_time)
+        if index >= len(plan):
+            self.stop()
+            return False
+        state.current_session = index + 1
+        state.is_running = True
+        state.start_time = start_time
+        state.end_time = start_time + plan.offsets[index]
+        state.time_remaining = state.end_time - now
+        return True
+
+    def stop(self):
+        state = self.state
+        state.is_running = False
+        state.current_session = 0
+        state.time_remaining = 0
+        state.start_time = None
+        state.end_time = None
+
+    def snapshot(self):
+        state = self.state
+        plan = state.plan
+        if not state.current_session:
+            return TimerSnapshot(state.is_running, 0, len(plan), "", state.time_remaining, 0, 0, plan)
+        index = state.current_session - 1
+        remaining = state.time_remaining
+        return TimerSnapshot(
+            state.is_running,
+            state.current_session,
+            len(plan),
+            plan.segments[index].label,
+            remaining,
+            plan.remaining_total(index, remaining),
+            plan.progress(index, remaining),
+            plan,
+        )
+
+    def advance(self, now=None):
+        state = self.state
+        if not state.is_running:
+            return ()
+        if now is None:
+            now = self.clock()
+
+        remaining = state.end_time - now
+        if remaining > 0:
+            state.time_remaining = remaining
+            return ()
+
+        # Uma ou mais sessões terminaram: localizar a sessão atual pelo tempo decorrido
+        plan = state.plan
+        previous = state.current_session
+        index = max(plan.locate(now - state.start_time), previous)
+
+        if index < len(plan):
+            ended = SessionEnded(index, state.start_time + plan.offsets[index - 1], index - previous)
+            state.current_session = index + 1
+            state.end_time = state.start_time + plan.offsets[index]
+            state.time_remaining = state.end_time - now
+            return (ended,)
+
+        # Treino completo
+        total = len(plan)
+        ended = SessionEnded(total, state.start_time + plan.total_duration, total - previous)
+        self.stop()
+        return (ended, WorkoutCompleted(ended.at))
@@ -0,0 +1,103 @@
+import time
+from functools import lru_cache
+
+# numpy e pygame são importados nas funções: só quem sintetiza paga a importação
+
+# Envelopes nomeados: (ataque, relaxamento) em segundos
+ENVELOPES = {
+    "percussivo": (0.002, None),  # Ataque curto e decaimento exponencial
+    "suave": (0.02, 0.08),        # Ataque e relaxamento lineares
+}
+
+AMPLITUDE = 0.6
+
+
+@lru_cache(maxsize=64)
+def tone(frequency, duration, envelope, sample_rate):
+    # Onda senoidal mono int16, gerada de forma vetorizada e memorizada
+    import numpy as np
+
+    samples = int(round(duration * sample_rate))
+    t = np.arange(samples, dtype=np.float32) / np.float32(sample_rate)
+    wave = np.sin(np.float32(2 * np.pi * frequency) * t)
+
+    attack, release = ENVELOPES[envelope]
+    gain = np.minimum(1.0, t / np.float32(attack))
+    if release is None:
+        gain *= np.exp(-t * np.float32(5.0 / duration))
+    else:
+        gain *= np.clip((np.float32(duration) - t) / np.float32(release), 0.0, 1.0)
+
+    pcm = (wave * gain * np.float32(AMPLITUDE * 32767)).astype(np.int16)
+    pcm.flags.writeable = False
+    return pcm
+
+
+@lru_cache(maxsize=32)
+def sequence(notes, sample_rate):
+    # Concatena tons (frequência, duração, envelope) num único buffer
+    import numpy as np
+
+    pcm = np.concatenate([tone(frequency, duration, envelope, sample_rate) for frequency, duration, envelope in notes])
+    pcm.flags.writeable = False
+    return pcm
+
+
+# Avisos sintetizados do timer
+CUES = {
+    # Tique dos últimos segundos da sessão (3-2-1)
+    "countdown": ((880, 0.08, "percussivo"),),
+    # Fim do treino: arpejo ascendente
+    "workout_end": ((523.25, 0.15, "suave"), (659.25, 0.15, "suave"), (783.99, 0.45, "suave")),
+}
+
+
+@lru_cache(maxsize=32)
+def frames(notes, sample_rate, channels):
+    # Buffer no layout do mixer (amostras x canais), intercalado uma vez por formato:
+    # o pygame só aceita arrays contíguos, então uma view com stride 0 não serve
+    import numpy as np
+
+    pcm = sequence(notes, sample_rate)
+    if channels == 1:
+        return pcm
+    pcm = np.repeat(pcm[:, np.newaxis], channels, axis=1)
+    pcm.flags.writeable = False
+    return pcm
+
+
+def make_sound(notes):
+    # Cria o Sound no formato do mixer; o buffer PCM vem do cache, sem I/O de arquivo nem cópia por chamada
+    import pygame
+
+    frequency, size, channels = pygame.mixer.get_init()
+    if size != -16:
+        # Os tons são gerados em int16; outro formato tocaria ruído
+        raise RuntimeError(f"formato do mixer não suportado ({size} bits; esperado -16)")
+    return pygame.sndarray.make_sound(frames(tuple(notes), frequency, channels))
+
+
+class ToneCue:
+    # Mesmo contrato do SoundCache: get()/revalidate() e `error`
+    def __init__(self, notes, decode):
+        self._notes = notes
+        self._decode = decode
+        self._sound = None
+        self.error = None
+        self.load_time = 0.0
+
+    def get(self):
+        if self._sound is None and self.error is None:
+            started = time.perf_counter()
+            try:
+                self._sound = self._decode(self._notes)
+            except Exception as e:
+                self.error = f"Erro ao sintetizar o som: {e}"
+            self.load_time = time.perf_counter() - started
+        return self._sound
+
+    def revalidate(self):
+        # Sem som carregado, um erro anterior não é definitivo: tentar de novo
+        if self._sound is None:
+            self.error = None
+        return self.get()
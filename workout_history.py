@@ -0,0 +1,266 @@
+import atexit
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import closing
+
+# Banco SQLite do histórico de treinos (vazio: histórico desligado)
+HISTORY_PATH = os.environ.get(
+    "TIMER_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "historico.db"),
+)
+# Janela de agrupamento das gravações: eventos dentro dela vão na mesma transação (segundos)
+FLUSH_INTERVAL = float(os.environ.get("TIMER_HISTORY_FLUSH", "1.0"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS treinos (
+    id INTEGER PRIMARY KEY,
+    equipe TEXT NOT NULL,
+    dia TEXT NOT NULL,                  -- data local do início (AAAA-MM-DD)
+    inicio REAL NOT NULL,               -- epoch
+    fim REAL,
+    sessoes_previstas INTEGER NOT NULL,
+    sessoes_concluidas INTEGER NOT NULL DEFAULT 0,
+    duracao_prevista REAL NOT NULL,
+    duracao_real REAL,
+    concluido INTEGER,                  -- 1 concluído, 0 parado, NULL em andamento
+    atraso_max_ms REAL,
+    atraso_medio_ms REAL
+);
+-- Índices cobrem as colunas das agregações: somas por equipe/dia não leem a tabela
+CREATE INDEX IF NOT EXISTS treinos_equipe_dia ON treinos (equipe, dia, concluido, duracao_real);
+CREATE INDEX IF NOT EXISTS treinos_dia ON treinos (dia, concluido, duracao_real);
+CREATE INDEX IF NOT EXISTS treinos_equipe_inicio ON treinos (equipe, inicio);
+CREATE TABLE IF NOT EXISTS sessoes (
+    treino INTEGER NOT NULL REFERENCES treinos (id),
+    sessao INTEGER NOT NULL,
+    rotulo TEXT NOT NULL,
+    prevista REAL NOT NULL,
+    real REAL NOT NULL,
+    atraso_ms REAL NOT NULL,
+    PRIMARY KEY (treino, sessao)
+) WITHOUT ROWID;
+"""
+
+
+class _Run:
+    # Treino em andamento, visto só pela thread de gravação
+    __slots__ = ("id", "plan", "started", "wall", "last_end", "done", "late_sum", "late_max")
+
+    def __init__(self, id, plan, started, wall):
+        self.id = id
+        self.plan = plan
+        self.started = started
+        self.wall = wall
+        self.last_end = started
+        self.done = 0
+        self.late_sum = 0.0
+        self.late_max = 0.0
+
+
+class WorkoutHistory:
+    """Histórico de treinos por equipe num SQLite em modo WAL.
+
+    Os timers só enfileiram eventos (início, fim de cada sessão, conclusão
+    ou parada) com tempos do seu relógio monotônico; uma thread própria
+    grava a fila em lote, uma transação por janela de `flush_interval`,
+    fora do caminho do tick. Datas e horas vêm de um único instante de
+    parede tomado no início, então ajustes do relógio do sistema não
+    distorcem as durações.
+    """
+
+    def __init__(self, path=HISTORY_PATH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.last_error = None
+        self._queue = deque()
+        self._pending = threading.Event()
+        self._keys = itertools.count(1)
+        self._runs = {}
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._reader = None
+        self._read_lock = threading.Lock()
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        # Em WAL, NORMAL só arrisca a última transação numa queda de energia
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # Eventos dos timers: só entram na fila
+
+    def start(self, team, plan, started_at, wall):
+        key = next(self._keys)
+        self._put(("inicio", key, team, plan, started_at, wall))
+        return key
+
+    def session_ended(self, key, session, skipped, at):
+        self._put(("sessao", key, session, skipped, at))
+
+    def finish(self, key, at, completed):
+        self._put(("fim", key, at, completed))
+
+    def _put(self, event):
+        self._queue.append(event)
+        self._pending.set()
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="timer-history", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        db = self._connect()
+        while True:
+            self._pending.wait()
+            time.sleep(self.flush_interval)
+            self._pending.clear()
+            self._write(db)
+
+    def flush(self):
+        # Grava o que estiver na fila a partir da thread chamadora (encerramento, benchmarks)
+        with closing(self._connect()) as db:
+            self._write(db)
+
+    def _write(self, db):
+        with self._write_lock:
+            treinos, sessoes, fins = 0, [], []
+            # Treinos abertos e encerrados no lote só valem depois do commit
+            runs = dict(self._runs)
+            try:
+                with db:
+                    while self._queue:
+                        event = self._queue.popleft()
+                        kind, key = event[0], event[1]
+                        if kind == "inicio":
+                            runs[key] = self._insert(db, *event[2:])
+                            treinos += 1
+                        elif key in runs:
+                            if kind == "sessao":
+                                sessoes.extend(self._sessions(runs[key], *event[2:]))
+                            else:
+                                fins.append(self._finished(runs.pop(key), *event[2:]))
+                    db.executemany("INSERT OR IGNORE INTO sessoes VALUES (?, ?, ?, ?, ?, ?)", sessoes)
+                    db.executemany(
+                        "UPDATE treinos SET fim = ?, duracao_real = ?, sessoes_concluidas = ?, concluido = ?,"
+                        " atraso_max_ms = ?, atraso_medio_ms = ? WHERE id = ?",
+                        fins,
+                    )
+            except sqlite3.Error as e:
+                # O lote é perdido, mas o timer segue; o erro aparece na tela de histórico.
+                # Os ids inseridos nele não existem mais, e os treinos encerrados nele não têm mais eventos
+                self.last_error = str(e)
+                self._runs = {key: run for key, run in self._runs.items() if key in runs}
+                return
+            self._runs = runs
+            self.written += treinos + len(sessoes) + len(fins)
+
+    def _insert(self, db, team, plan, started_at, wall):
+        cursor = db.execute(
+            "INSERT INTO treinos (equipe, dia, inicio, sessoes_previstas, duracao_prevista) VALUES (?, ?, ?, ?, ?)",
+            (team, time.strftime("%Y-%m-%d", time.localtime(wall)), wall, len(plan), plan.total_duration),
+        )
+        return _Run(cursor.lastrowid, plan, started_at, wall)
+
+    def _sessions(self, run, session, skipped, at):
+        # Sessões que terminaram juntas num atraso saem do mesmo evento
+        plan = run.plan
+        for number in range(max(session - skipped, run.done + 1), session + 1):
+            lateness = (at - (run.started + plan.offsets[number - 1])) * 1000
+            segment = plan.segments[number - 1]
+            yield (run.id, number, segment.label, segment.duration, at - run.last_end, lateness)
+            run.last_end = at
+            run.done = number
+            run.late_sum += lateness
+            run.late_max = max(run.late_max, lateness)
+
+    def _finished(self, run, at, completed):
+        mean = run.late_sum / run.done if run.done else None
+        return (
+            run.wall + at - run.started, at - run.started, run.done, int(completed),
+            run.late_max if run.done else None, mean, run.id,
+        )
+
+    # Consultas
+
+    def _query(self, sql, params):
+        # Uma conexão de leitura compartilhada: abrir e fechar a cada consulta custa mais que a
+        # própria consulta (esquema relido e, ao fechar a última conexão, checkpoint do WAL)
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            return self._reader.execute(sql, params).fetchall()
+
+    def totals(self, team, days=30):
+        # Treinos, concluídos, taxa de conclusão e tempo total de treino nos últimos `days` dias
+        count, closed, completed, seconds = self._query(
+            "SELECT count(*), count(concluido), coalesce(sum(concluido), 0), coalesce(sum(duracao_real), 0)"
+            " FROM treinos WHERE equipe = ? AND dia >= ?",
+            (team, _since(days)),
+        )[0]
+        return {
+            "treinos": count,
+            "concluidos": completed,
+            "taxa_conclusao": completed / closed if closed else None,
+            "tempo_total": seconds,
+        }
+
+    def daily(self, team=None, days=30):
+        # Agregado por dia de uma equipe, ou de todas com `team=None`
+        where, params = ("equipe = ? AND dia >= ?", (team, _since(days))) if team is not None else ("dia >= ?", (_since(days),))
+        rows = self._query(
+            "SELECT dia, count(*), coalesce(sum(concluido), 0), coalesce(sum(duracao_real), 0)"
+            f" FROM treinos WHERE {where} GROUP BY dia ORDER BY dia",
+            params,
+        )
+        return [{"dia": day, "treinos": count, "concluidos": completed, "tempo_total": seconds}
+                for day, count, completed, seconds in rows]
+
+    def recent(self, team, limit=10):
+        rows = self._query(
+            "SELECT inicio, sessoes_concluidas, sessoes_previstas, duracao_prevista, duracao_real, concluido,"
+            " atraso_max_ms FROM treinos WHERE equipe = ? ORDER BY inicio DESC LIMIT ?",
+            (team, limit),
+        )
+        return [
+            {
+                "inicio": started, "sessoes": done, "sessoes_previstas": planned_sessions,
+                "duracao_prevista": planned, "duracao_real": actual, "concluido": completed,
+                "atraso_max_ms": late_max,
+            }
+            for started, done, planned_sessions, planned, actual, completed, late_max in rows
+        ]
+
+
+def _since(days):
+    return time.strftime("%Y-%m-%d", time.localtime(time.time() - (days - 1) * 86400))
+
+
+_default = None
+_default_lock = threading.Lock()
+# Falha ao abrir o banco: registrada uma vez, sem nova tentativa a cada rerun
+open_error = None
+
+
+def default_history():
+    # Histórico do processo, criado sob demanda; None se desligado ou se o banco não abre
+    global _default, open_error
+    if _default is None and HISTORY_PATH and open_error is None:
+        with _default_lock:
+            if _default is None and open_error is None:
+                try:
+                    _default = WorkoutHistory()
+                except sqlite3.Error as e:
+                    open_error = f"{HISTORY_PATH}: {e}"
+                    return None
+                atexit.register(_default.flush)
+    return _default
@@ -0,0 +1,69 @@
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class Segment(NamedTuple):
+    label: str
+    duration: float
+
+
+class CompiledPlan:
+    """Plano de treino compilado em offsets cumulativos.
+
+    `offsets[i]` é o instante (relativo ao início) em que o segmento `i`
+    termina. Localizar o segmento atual é um bisect sobre o tempo decorrido,
+    e tempo restante e progresso são consultas O(1).
+    """
+
+    __slots__ = ("segments", "offsets", "total_duration")
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+        self.offsets = array("d")
+        elapsed = 0.0
+        for segment in self.segments:
+            elapsed += segment.duration
+            self.offsets.append(elapsed)
+        self.total_duration = elapsed
+
+    def __len__(self):
+        return len(self.segments)
+
+    def locate(self, elapsed):
+        # Índice (0-based) do segmento em andamento no instante `elapsed`
+        return bisect_right(self.offsets, elapsed)
+
+    def segment_start(self, index):
+        return self.offsets[index - 1] if index else 0.0
+
+    def remaining_total(self, index, segment_remaining):
+        return self.total_duration - self.offsets[index] + segment_remaining
+
+    def progress(self, index, segment_remaining):
+        if self.total_duration <= 0:
+            return 0
+        elapsed = self.total_duration - self.remaining_total(index, segment_remaining)
+        return int(elapsed / self.total_duration * 100)
+
+
+# Planos compilados são imutáveis e reaproveitados entre reruns e sessões
+@lru_cache(maxsize=256)
+def simple_plan(total_sessions, session_duration):
+    return CompiledPlan([Segment("Sessão", session_duration)] * total_sessions)
+
+
+@lru_cache(maxsize=256)
+def interval_plan(work, rest, rounds, warmup=0, cooldown=0):
+    segments = []
+    if warmup:
+        segments.append(Segment("Aquecimento", warmup))
+    for round_number in range(rounds):
+        segments.append(Segment("Trabalho", work))
+        # Sem descanso depois da última rodada
+        if rest and round_number < rounds - 1:
+            segments.append(Segment("Descanso", rest))
+    if cooldown:
+        segments.append(Segment("Desaquecimento", cooldown))
+    return CompiledPlan(segments)